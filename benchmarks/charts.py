@@ -0,0 +1,89 @@
+"""
+Measure chart build time, serialization time and figure payload size against league size.
+
+Each chart is built twice: in the automatic mode the app uses, and with every entry
+drawn ("full"), which is how the charts were built before the large-league modes.
+
+Usage:
+    python -m benchmarks.charts --sizes 10 100 1000 --output charts.json
+"""
+import argparse
+import json
+import math
+import sys
+import time
+
+from benchmarks.synthetic import make_league_history
+from src import charts, questions
+
+DEFAULT_SIZES = [10, 30, 100, 300, 1_000]
+
+
+def chart_inputs(df):
+    return {
+        "total_points_figure": (charts.total_points_figure, questions.get_points_by_gameweek(df), "max_lines"),
+        "total_bench_points_figure": (
+            charts.total_bench_points_figure, questions.get_total_points_left_on_bench(df), "max_bars"
+        ),
+        "week_bench_points_figure": (
+            charts.week_bench_points_figure, questions.get_most_points_left_on_bench_week(df), "max_bars"
+        ),
+        "total_vs_bench_points_figure": (
+            charts.total_vs_bench_points_figure, questions.get_total_points_and_bench_points(df), "max_bars"
+        ),
+    }
+
+
+def measure_figure(builder, data, **kwargs):
+    start = time.perf_counter()
+    fig = builder(data.copy(), **kwargs)
+    built = time.perf_counter()
+    payload = fig.to_json()
+    serialized = time.perf_counter()
+    return {
+        "build_s": round(built - start, 6),
+        "to_json_s": round(serialized - built, 6),
+        "payload_bytes": len(payload),
+        "traces": len(fig.data),
+        "webgl": any(trace.type == "scattergl" for trace in fig.data),
+    }
+
+
+def run(sizes, n_events=38):
+    results = []
+    for n_entries in sorted(sizes):
+        df = make_league_history(n_entries, n_events)
+        for chart, (builder, data, limit) in chart_inputs(df).items():
+            for mode, kwargs in (("auto", {}), ("full", {limit: math.inf})):
+                result = {"chart": chart, "mode": mode, "entries": n_entries}
+                result.update(measure_figure(builder, data, **kwargs))
+                results.append(result)
+                print(
+                    f"{chart:<30} {mode:<5} {n_entries:>6} entries "
+                    f"{result['payload_bytes'] / 1024:>10.1f}KB {result['build_s'] + result['to_json_s']:>8.3f}s",
+                    file=sys.stderr,
+                )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--events", type=int, default=38)
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    # Warm up plotly's lazy imports so they aren't charged to the first chart
+    measure_figure(charts.total_points_figure, questions.get_points_by_gameweek(make_league_history(2, 2)))
+    output = json.dumps({"sizes": sorted(args.sizes), "events": args.events, "results": run(args.sizes, args.events)},
+                        indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
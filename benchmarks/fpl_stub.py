@@ -0,0 +1,179 @@
+"""
+A local stub of the FPL API serving synthetic leagues, for tests and load tests.
+
+Usage:
+    python -m benchmarks.fpl_stub --port 8765 --league 1:20 --league 2:500 --finished-event 10
+    FPL_API_BASE_URL=http://127.0.0.1:8765/api/ streamlit run app.py
+"""
+import argparse
+import collections
+import json
+import re
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import make_histories, make_standings
+from src.fpl_load import HistoryLoader, StandingsLoader
+
+N_EVENTS = 38
+# The API pages classic league standings 50 entries at a time
+STANDINGS_PAGE_SIZE = 50
+
+
+def _api_columns(df, schema_mapping):
+    # Undo the loaders' renames so responses look like the real API
+    return df.rename(columns={v: k for k, v in schema_mapping.items()})
+
+
+class FPLStub:
+    """
+    Serve bootstrap-static, classic league standings and entry histories for synthetic leagues.
+
+    leagues maps league_id to number of entries. Histories are served up to current_event,
+    and bootstrap-static reports events up to finished_event as finished and data checked.
+    Every request path is counted in request_counts. Paths in fail_next get a 503 instead
+    of their response, that many times.
+    """
+
+    def __init__(self, leagues, finished_event=N_EVENTS, current_event=None, host="127.0.0.1", port=0):
+        self.finished_event = finished_event
+        self.current_event = current_event
+        self.request_counts = collections.Counter()
+        self.fail_next = collections.Counter()
+        self.standings = {}
+        self.histories = {}
+        for league_id, n_entries in leagues.items():
+            standings_df = make_standings(n_entries, N_EVENTS, seed=league_id)
+            self.standings[league_id] = _api_columns(
+                standings_df, StandingsLoader.standings_schema_mapping
+            ).to_dict(orient="records")
+            for history_df in make_histories(standings_df, N_EVENTS, seed=league_id):
+                records = _api_columns(
+                    history_df.drop(columns="entry"), HistoryLoader.history_schema_mapping
+                ).to_dict(orient="records")
+                self.histories[int(history_df["entry"].iloc[0])] = records
+
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/api/"
+
+    def bootstrap(self):
+        current = self.current_event or self.finished_event
+        return {
+            "events": [
+                {
+                    "id": event,
+                    "name": f"Gameweek {event}",
+                    "deadline_time": None,
+                    "finished": event <= self.finished_event,
+                    "data_checked": event <= self.finished_event,
+                    "is_previous": event == current - 1,
+                    "is_current": event == current,
+                    "is_next": event == current + 1,
+                }
+                for event in range(1, N_EVENTS + 1)
+            ]
+        }
+
+    def route(self, path, query=""):
+        """
+        Return the JSON body for an API path and query string, or None for a 404.
+        """
+        if path == "/api/bootstrap-static/":
+            return self.bootstrap()
+        match = re.fullmatch(r"/api/leagues-classic/(\d+)/standings/", path)
+        if match and int(match.group(1)) in self.standings:
+            results = self.standings[int(match.group(1))]
+            page = int(urllib.parse.parse_qs(query).get("page_standings", ["1"])[0])
+            start = (page - 1) * STANDINGS_PAGE_SIZE
+            return {
+                "standings": {
+                    "has_next": start + STANDINGS_PAGE_SIZE < len(results),
+                    "page": page,
+                    "results": results[start:start + STANDINGS_PAGE_SIZE],
+                }
+            }
+        match = re.fullmatch(r"/api/entry/(\d+)/history/", path)
+        if match and int(match.group(1)) in self.histories:
+            last_event = self.current_event or self.finished_event
+            history = self.histories[int(match.group(1))][:last_event]
+            return {"current": history}
+        return None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path, _, query = self.path.partition("?")
+                stub.request_counts[path] += 1
+                if stub.fail_next[path] > 0:
+                    stub.fail_next[path] -= 1
+                    self.send_error(503)
+                    return
+                body = stub.route(path, query)
+                if body is None:
+                    self.send_error(404)
+                    return
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def parse_league(value):
+    league_id, n_entries = value.split(":")
+    return int(league_id), int(n_entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--league", type=parse_league, action="append", default=None,
+                        help="league_id:entries, repeatable.")
+    parser.add_argument("--finished-event", type=int, default=N_EVENTS)
+    args = parser.parse_args(argv)
+
+    stub = FPLStub(dict(args.league or [(1, 20)]), args.finished_event, host=args.host, port=args.port)
+    print(f"Serving the FPL stub at {stub.base_url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
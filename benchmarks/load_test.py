@@ -0,0 +1,166 @@
+"""
+Load test the headless API (src.api) against the local FPL stub.
+
+The API runs in its own process, pointed at an FPLStub with FPL_API_BASE_URL, and many
+concurrent clients request random questions, some revalidating with If-None-Match.
+
+Usage:
+    python -m benchmarks.load_test --leagues 3 --entries 200 --clients 50 --requests 2000 --output load.json
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from tornado.httpclient import AsyncHTTPClient
+
+from benchmarks.fpl_stub import FPLStub
+from src.api import ARROW_CONTENT_TYPE
+from src.questions import WRAPPED_QUESTIONS
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_api(base_url, path, port):
+    """
+    Start `python -m src.api` against the FPL API at base_url and wait until it is listening.
+    """
+    env = {**os.environ, "FPL_API_BASE_URL": base_url}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "src.api", "--port", str(port), "--path", path],
+        env=env, stdout=subprocess.PIPE, text=True,
+    )
+    line = process.stdout.readline()
+    if not line:
+        raise RuntimeError(f"API exited with {process.wait()}")
+    return process, json.loads(line)["listening"]
+
+
+async def run_clients(api_url, league_ids, clients, requests, revalidate, arrow, seed=0):
+    """
+    Issue requests spread over clients concurrent clients and return one record per request.
+    """
+    rng = random.Random(seed)
+    http = AsyncHTTPClient(max_clients=clients)
+    etags = {}
+    records = []
+    remaining = iter(range(requests))
+
+    async def client():
+        for _ in remaining:
+            url = f"{api_url}leagues/{rng.choice(league_ids)}/questions/{rng.choice(list(WRAPPED_QUESTIONS))}"
+            headers = {"Accept-Encoding": "gzip"}
+            if rng.random() < arrow:
+                headers["Accept"] = ARROW_CONTENT_TYPE
+            if url in etags and rng.random() < revalidate:
+                headers["If-None-Match"] = etags[url]
+            start = time.perf_counter()
+            # Responses are left compressed so bytes are measured as sent over the wire
+            response = await http.fetch(url, headers=headers, decompress_response=False, raise_error=False)
+            records.append((time.perf_counter() - start, response.code, len(response.body or b"")))
+            if "Etag" in response.headers:
+                etags[url] = response.headers["Etag"]
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return records
+
+
+async def warm_up(api_url, league_ids):
+    """
+    Request every league once, so each is loaded from the stub and stored before the timed run.
+    """
+    http = AsyncHTTPClient()
+
+    async def fetch(league_id):
+        start = time.perf_counter()
+        response = await http.fetch(f"{api_url}leagues/{league_id}/questions/boring", raise_error=False)
+        return time.perf_counter() - start, response.code, len(response.body or b"")
+
+    return await asyncio.gather(*(fetch(league_id) for league_id in league_ids))
+
+
+def summarize(records, seconds):
+    latencies = np.array([latency for latency, _, _ in records])
+    statuses = collections.Counter(code for _, code, _ in records)
+    return {
+        "requests": len(records),
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(records) / seconds, 1),
+        "latency_ms": {
+            f"p{q}": round(float(np.percentile(latencies, q)) * 1000, 2) for q in (50, 90, 99)
+        } | {"max": round(float(latencies.max()) * 1000, 2)},
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "not_modified_share": round(statuses[304] / len(records), 3),
+        "bytes": sum(n for _, _, n in records),
+    }
+
+
+def run(n_leagues, n_entries, clients, requests, revalidate, arrow, finished_event):
+    league_ids = list(range(1, n_leagues + 1))
+    stub = FPLStub({league_id: n_entries for league_id in league_ids}, finished_event=finished_event).start()
+    with tempfile.TemporaryDirectory() as directory:
+        process, api_url = start_api(stub.base_url, os.path.join(directory, "results.sqlite"), _free_port())
+        try:
+            # Untimed warm-up: the first request per league loads it from the stub and fills the store
+            start = time.perf_counter()
+            warmup = asyncio.run(warm_up(api_url, league_ids))
+            warmup_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            records = asyncio.run(run_clients(api_url, league_ids, clients, requests, revalidate, arrow))
+            result = summarize(records, time.perf_counter() - start)
+        finally:
+            process.terminate()
+            process.wait()
+            stub.stop()
+
+    result["warmup"] = summarize(warmup, warmup_seconds)
+    result["stub_requests"] = sum(stub.request_counts.values())
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--leagues", type=int, default=3)
+    parser.add_argument("--entries", type=int, default=100, help="Entries per league.")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients.")
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--revalidate", type=float, default=0.5,
+                        help="Share of repeat requests sent with If-None-Match.")
+    parser.add_argument("--arrow", type=float, default=0.2, help="Share of requests asking for Arrow.")
+    parser.add_argument("--finished-event", type=int, default=20)
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(
+        {
+            "leagues": args.leagues,
+            "entries": args.entries,
+            "clients": args.clients,
+            "results": run(args.leagues, args.entries, args.clients, args.requests,
+                           args.revalidate, args.arrow, args.finished_event),
+        },
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
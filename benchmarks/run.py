@@ -0,0 +1,349 @@
+"""
+Benchmark the league loaders, the questions and the chart preparation against synthetic leagues.
+
+Usage:
+    python -m benchmarks.run --sizes 10 100 1000 10000 --output bench.json
+    python -m benchmarks.run --compare bench.json --output bench_new.json
+"""
+import argparse
+import datetime
+import inspect
+import json
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.synthetic import make_league_loader
+from src import charts, questions, rank_sketch
+from src.results_store import ResultsStore
+
+DEFAULT_SIZES = [10, 100, 1_000, 10_000]
+# Ignore scaling between timings this small, they are dominated by fixed overhead
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def question_cases():
+    """
+    Every get_* function in src.questions, timed against the league history DataFrame.
+    """
+    return {
+        f"questions.{name}": (lambda ctx, func=func: func(ctx["df"]))
+        for name, func in inspect.getmembers(questions, inspect.isfunction)
+        if name.startswith("get_") and func.__module__ == questions.__name__
+    }
+
+
+def chart_cases():
+    """
+    The figure builders used by app.py, timed against their question outputs.
+    """
+    cases = {
+        "charts.total_points_figure": lambda ctx: charts.total_points_figure(
+            ctx["points_by_gameweek"]
+        ),
+        "charts.total_bench_points_figure": lambda ctx: charts.total_bench_points_figure(
+            ctx["total_bench_points"]
+        ),
+        "charts.week_bench_points_figure": lambda ctx: charts.week_bench_points_figure(
+            ctx["week_bench_points"]
+        ),
+        "charts.total_vs_bench_points_figure": lambda ctx: charts.total_vs_bench_points_figure(
+            ctx["total_points_and_bench_points"].copy()
+        ),
+    }
+    try:
+        import bar_chart_race as bcr
+    except ImportError:
+        return cases
+
+    cases["charts.bar_chart_race.prepare_long_data"] = lambda ctx: bcr.prepare_long_data(
+        ctx["points_by_gameweek"],
+        index="gameweek",
+        columns="entry_name",
+        values="points",
+        steps_per_period=1,
+    )
+    return cases
+
+
+def all_cases():
+    cases = {"fpl_load.LeagueHistoryLoader.get_data": lambda ctx: ctx["loader"].get_data()}
+    cases.update(question_cases())
+    cases.update(chart_cases())
+    cases["rank_sketch.PointsSketch.add"] = lambda ctx: rank_sketch.PointsSketch().add(
+        ctx["df"]["event"], ctx["cumulative_points"]
+    )
+    cases["rank_sketch.get_approximate_player_best_rank_event"] = (
+        lambda ctx: rank_sketch.get_approximate_player_best_rank_event(ctx["sketch"], ctx["df"])
+    )
+    cases["results_store.ResultsStore.get"] = lambda ctx: ctx["store"].get(
+        ctx["loader"].league_id, ctx["last_event"]
+    )
+    return cases
+
+
+def build_context(n_entries, n_events, seed):
+    loader = make_league_loader(n_entries, n_events, seed)
+    df = loader.get_data()
+    points_by_gameweek = questions.get_points_by_gameweek(df)
+    cumulative_points = (
+        df.sort_values("event").groupby("entry")["event_points"].cumsum().sort_index()
+    )
+    sketch = rank_sketch.PointsSketch()
+    sketch.add(df["event"], cumulative_points)
+
+    # Store points_by_gameweek, the largest result, under every question name: an upper
+    # bound on the read cost that avoids answering the slow questions at every size.
+    store = ResultsStore(":memory:")
+    store.put(
+        loader.league_id,
+        n_events,
+        {name: points_by_gameweek for name in questions.WRAPPED_QUESTIONS},
+    )
+    return {
+        "loader": loader,
+        "df": df,
+        "store": store,
+        "last_event": n_events,
+        "cumulative_points": cumulative_points,
+        "sketch": sketch,
+        "points_by_gameweek": points_by_gameweek,
+        "total_bench_points": questions.get_total_points_left_on_bench(df),
+        "week_bench_points": questions.get_most_points_left_on_bench_week(df),
+        "total_points_and_bench_points": questions.get_total_points_and_bench_points(df),
+    }
+
+
+def time_case(func, ctx, repeat):
+    # Untimed warm-up run, so lazy imports and caches aren't charged to the first repeat
+    func(ctx)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(ctx)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def scaling_exponent(size_a, seconds_a, size_b, seconds_b):
+    """
+    Estimate k in t ~ n^k from two timings, or None when the timings are too small to trust.
+    """
+    if min(seconds_a, seconds_b) < NOISE_FLOOR_SECONDS or size_a == size_b:
+        return None
+    return math.log(seconds_b / seconds_a) / math.log(size_b / size_a)
+
+
+def summarise_scaling(results, max_exponent):
+    """
+    Fit a scaling exponent between each pair of consecutive sizes for every case.
+
+    A case is flagged super_linear when any exponent exceeds max_exponent.
+    """
+    by_case = {}
+    for result in results:
+        if result["status"] == "ok":
+            by_case.setdefault(result["case"], []).append(result)
+
+    scaling = {}
+    for case, case_results in by_case.items():
+        case_results.sort(key=lambda r: r["entries"])
+        exponents = []
+        for a, b in zip(case_results, case_results[1:]):
+            exponent = scaling_exponent(
+                a["rows"], a["median_s"], b["rows"], b["median_s"]
+            )
+            if exponent is not None:
+                exponents.append(round(exponent, 3))
+        worst = max(exponents) if exponents else None
+        scaling[case] = {
+            "exponents": exponents,
+            "max_exponent": worst,
+            "super_linear": worst is not None and worst > max_exponent,
+        }
+    return scaling
+
+
+def compare_results(results, baseline, max_ratio):
+    """
+    List the (case, entries) timings that got slower than the baseline by more than max_ratio.
+    """
+    previous = {
+        (r["case"], r["entries"]): r
+        for r in baseline["results"]
+        if r["status"] == "ok"
+    }
+    regressions = []
+    for result in results:
+        before = previous.get((result["case"], result["entries"]))
+        if result["status"] != "ok" or before is None:
+            continue
+        if before["median_s"] < NOISE_FLOOR_SECONDS:
+            continue
+        ratio = result["median_s"] / before["median_s"]
+        if ratio > max_ratio:
+            regressions.append(
+                {
+                    "case": result["case"],
+                    "entries": result["entries"],
+                    "baseline_median_s": before["median_s"],
+                    "median_s": result["median_s"],
+                    "ratio": round(ratio, 3),
+                }
+            )
+    return regressions
+
+
+def run_benchmarks(sizes, n_events=38, repeat=3, max_seconds=30.0, cases=None, seed=0):
+    """
+    Time every case at every league size.
+
+    Once a case has taken longer than max_seconds, or its fitted scaling predicts that
+    the next size will, the larger sizes are recorded as skipped rather than run.
+    """
+    cases = cases or all_cases()
+    results = []
+    last_ok = {}
+    for n_entries in sorted(sizes):
+        ctx = build_context(n_entries, n_events, seed)
+        rows = len(ctx["df"])
+        for case, func in cases.items():
+            result = {"case": case, "entries": n_entries, "events": n_events, "rows": rows}
+            previous = last_ok.get(case)
+            if previous is not None:
+                exponent = max(previous.get("exponent") or 1.0, 1.0)
+                predicted = previous["median_s"] * (rows / previous["rows"]) ** exponent
+                if previous["median_s"] > max_seconds or predicted > max_seconds:
+                    result.update(status="skipped", predicted_s=round(predicted, 3))
+                    results.append(result)
+                    continue
+            elif case in last_ok:
+                result.update(status="skipped")
+                results.append(result)
+                continue
+
+            try:
+                times = time_case(func, ctx, repeat)
+            except Exception as e:
+                result.update(status="error", error=f"{type(e).__name__}: {e}")
+                # Don't retry a failing case at larger sizes
+                last_ok[case] = None
+                results.append(result)
+                continue
+
+            result.update(
+                status="ok",
+                times_s=[round(t, 6) for t in times],
+                median_s=round(statistics.median(times), 6),
+                min_s=round(min(times), 6),
+            )
+            if previous is not None:
+                result["exponent"] = scaling_exponent(
+                    previous["rows"], previous["median_s"], rows, result["median_s"]
+                )
+            last_ok[case] = result
+            results.append(result)
+            print(
+                f"{case:<55} {n_entries:>7} entries {result['median_s']:>10.4f}s",
+                file=sys.stderr,
+            )
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import duckdb
+    import pandas as pd
+
+    return {
+        "git_commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "duckdb": duckdb.__version__,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="League sizes (number of entries) to benchmark, up to 100000.")
+    parser.add_argument("--events", type=int, default=38, help="Gameweeks per entry.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case and size.")
+    parser.add_argument("--max-seconds", type=float, default=30.0,
+                        help="Skip larger sizes once a case takes, or is predicted to take, longer.")
+    parser.add_argument("--max-exponent", type=float, default=1.3,
+                        help="Flag cases whose time grows faster than rows ** max-exponent.")
+    parser.add_argument("--case", action="append", dest="case_filter", default=None,
+                        help="Only run cases containing this substring (repeatable).")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    parser.add_argument("--compare", help="Baseline JSON results to check for regressions.")
+    parser.add_argument("--max-ratio", type=float, default=1.25,
+                        help="Flag timings slower than the baseline by more than this ratio.")
+    parser.add_argument("--fail-on-flag", action="store_true",
+                        help="Exit non-zero when a case is super-linear or regressed.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    cases = all_cases()
+    if args.case_filter:
+        cases = {
+            name: func
+            for name, func in cases.items()
+            if any(f in name for f in args.case_filter)
+        }
+
+    results = run_benchmarks(
+        args.sizes, args.events, args.repeat, args.max_seconds, cases
+    )
+    report = {
+        "environment": environment(),
+        "config": {
+            "sizes": sorted(args.sizes),
+            "events": args.events,
+            "repeat": args.repeat,
+            "max_seconds": args.max_seconds,
+            "max_exponent": args.max_exponent,
+        },
+        "results": results,
+        "scaling": summarise_scaling(results, args.max_exponent),
+    }
+    if args.compare:
+        with open(args.compare) as f:
+            report["regressions"] = compare_results(results, json.load(f), args.max_ratio)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    flagged = [case for case, s in report["scaling"].items() if s["super_linear"]]
+    for case in flagged:
+        print(f"SUPER-LINEAR: {case} (max exponent {report['scaling'][case]['max_exponent']})",
+              file=sys.stderr)
+    for regression in report.get("regressions", []):
+        print(f"REGRESSION: {regression['case']} at {regression['entries']} entries "
+              f"x{regression['ratio']}", file=sys.stderr)
+
+    if args.fail_on_flag and (flagged or report.get("regressions")):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Measure the cold import time of app.py with python -X importtime.
+
+Usage:
+    python -m benchmarks.startup --runs 5 --budget-ms 50 --output startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules app.py must not import before a league is requested. Ones streamlit imports
+# itself (e.g. pandas with streamlit 1.31) are outside our control and not flagged.
+HEAVY_MODULES = ["pandas", "duckdb", "plotly.express", "matplotlib", "bar_chart_race", "requests"]
+DEFAULT_BUDGET_MS = 50.0
+
+
+def parse_importtime(stderr):
+    """
+    Parse python -X importtime output into {module: (self_us, cumulative_us)}.
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        timings[module.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def import_time(module):
+    """
+    Import module in a fresh interpreter and return its importtime breakdown.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.splitlines()[-1]}")
+    return parse_importtime(result.stderr)
+
+
+def measure_startup(runs=5):
+    """
+    Time importing app.py, and the share of that spent importing streamlit.
+
+    The difference is what the app itself adds to a cold start, which is what the
+    budget applies to: streamlit's own import time is outside our control. Likewise
+    only heavy modules that app.py adds on top of a plain `import streamlit` are flagged.
+    """
+    from_streamlit = {m for m in HEAVY_MODULES if m in import_time("streamlit")}
+    app_ms, streamlit_ms, overhead_ms = [], [], []
+    heavy = set()
+    for _ in range(runs):
+        timings = import_time("app")
+        app_ms.append(timings["app"][1] / 1000)
+        streamlit_ms.append(timings["streamlit"][1] / 1000)
+        overhead_ms.append(app_ms[-1] - streamlit_ms[-1])
+        heavy.update(m for m in HEAVY_MODULES if m in timings and m not in from_streamlit)
+
+    return {
+        "runs": runs,
+        "app_ms": round(statistics.median(app_ms), 3),
+        "streamlit_ms": round(statistics.median(streamlit_ms), 3),
+        "overhead_ms": round(statistics.median(overhead_ms), 3),
+        "heavy_modules": sorted(heavy),
+        "heavy_modules_from_streamlit": sorted(from_streamlit),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Maximum import time app.py may add on top of streamlit.")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    report = measure_startup(args.runs)
+    report["budget_ms"] = args.budget_ms
+    report["within_budget"] = (
+        report["overhead_ms"] <= args.budget_ms and not report["heavy_modules"]
+    )
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if report["heavy_modules"]:
+        print(f"HEAVY IMPORTS AT STARTUP: {', '.join(report['heavy_modules'])}", file=sys.stderr)
+    if report["overhead_ms"] > args.budget_ms:
+        print(f"OVER BUDGET: app.py adds {report['overhead_ms']}ms (budget {args.budget_ms}ms)",
+              file=sys.stderr)
+    return 0 if report["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+from src.fpl_load import HistoryLoader, LeagueHistoryLoader, StandingsLoader
+from src.parquet_analytics import write_league_history
+
+
+def make_standings(n_entries, n_events=38, seed=0):
+    """
+    Generate a standings DataFrame shaped like StandingsLoader.get_data for a league of n_entries.
+    """
+    rng = np.random.default_rng(seed)
+    # Entry ids are unique per seed, so synthetic leagues don't share entries
+    entries = np.arange(1, n_entries + 1) * 7 + 100_000 + seed * 10_000_000
+    totals = rng.normal(55 * n_events, 6 * n_events, n_entries).round().astype(int)
+    order = np.argsort(-totals, kind="stable")
+    ranks = np.empty(n_entries, dtype=int)
+    ranks[order] = np.arange(1, n_entries + 1)
+
+    df = pd.DataFrame(
+        {
+            "id": np.arange(1, n_entries + 1) + 9_000_000,
+            "event_total": rng.integers(20, 110, n_entries),
+            "player_name": [f"Player {i}" for i in range(n_entries)],
+            "rank": ranks,
+            "last_rank": np.clip(ranks + rng.integers(-3, 4, n_entries), 1, None),
+            "rank_sort": ranks,
+            "total": totals,
+            "entry": entries,
+            "entry_name": [f"Team {i}" for i in range(n_entries)],
+        }
+    )
+    return df.rename(columns=StandingsLoader.standings_schema_mapping)
+
+
+def make_histories(standings_df, n_events=38, seed=0):
+    """
+    Generate one history DataFrame per entry, shaped like HistoryLoader.get_data.
+
+    Points, transfer hits and bench points are drawn from distributions that roughly
+    match a real classic league, so the analytics see realistic ties and spreads.
+    """
+    rng = np.random.default_rng(seed + 1)
+    entries = standings_df["entry"].to_numpy()
+    n_entries = len(entries)
+    shape = (n_entries, n_events)
+
+    event_points = np.clip(rng.normal(52, 14, shape), 0, None).round().astype(int)
+    event_transfers = rng.choice([0, 1, 2, 3], size=shape, p=[0.35, 0.45, 0.15, 0.05])
+    event_transfers_cost = np.where(
+        event_transfers > 1, (event_transfers - 1) * 4 * rng.integers(0, 2, shape), 0
+    )
+    points_on_bench = rng.poisson(6, shape)
+    total_points = np.cumsum(event_points - event_transfers_cost, axis=1)
+    fpl_event_rank = rng.integers(1, 11_000_000, shape)
+    overall_rank = rng.integers(1, 11_000_000, shape)
+    bank = rng.integers(0, 40, shape)
+    team_value = 1000 + np.cumsum(rng.integers(-2, 4, shape), axis=1)
+
+    columns = {
+        "event": np.tile(np.arange(1, n_events + 1), n_entries),
+        "points": event_points.ravel(),
+        "total_points": total_points.ravel(),
+        "rank": fpl_event_rank.ravel(),
+        "rank_sort": fpl_event_rank.ravel(),
+        "overall_rank": overall_rank.ravel(),
+        "bank": bank.ravel(),
+        "value": team_value.ravel(),
+        "event_transfers": event_transfers.ravel(),
+        "event_transfers_cost": event_transfers_cost.ravel(),
+        "points_on_bench": points_on_bench.ravel(),
+        "entry": np.repeat(entries, n_events),
+    }
+    df = pd.DataFrame(columns).rename(columns=HistoryLoader.history_schema_mapping)
+    return [
+        df.iloc[i * n_events:(i + 1) * n_events].reset_index(drop=True)
+        for i in range(n_entries)
+    ]
+
+
+def make_league_loader(n_entries, n_events=38, seed=0):
+    """
+    Build a LeagueHistoryLoader populated with synthetic data instead of API responses.
+    """
+    loader = LeagueHistoryLoader.__new__(LeagueHistoryLoader)
+    loader.league_id = seed
+    loader.standings = None
+    loader.standings_df = make_standings(n_entries, n_events, seed)
+    loader.entry_ids = loader.standings_df["entry"].tolist()
+    loader.histories = []
+    loader.history_dfs = make_histories(loader.standings_df, n_events, seed)
+    return loader
+
+
+def make_league_history(n_entries, n_events=38, seed=0):
+    """
+    Generate a DataFrame matching the LeagueHistoryLoader.get_data schema.
+    """
+    return make_league_loader(n_entries, n_events, seed).get_data()
+
+
+def write_synthetic_leagues(root, n_leagues, n_entries, n_events=38, first_league_id=1):
+    """
+    Write n_leagues synthetic league histories as partitioned Parquet, for src.parquet_analytics.
+    """
+    for league_id in range(first_league_id, first_league_id + n_leagues):
+        write_league_history(make_league_history(n_entries, n_events, seed=league_id), root)
@@ -0,0 +1,195 @@
+"""
+A headless HTTP API serving the wrapped results as JSON or Arrow.
+
+Usage:
+    python -m src.api --port 8000 --path wrapped_results.sqlite
+    curl --compressed localhost:8000/leagues/741068/questions/best_player_tally
+    curl -o boring.arrow 'localhost:8000/leagues/741068/questions/boring?format=arrow'
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+import requests
+import tornado.web
+
+from src import fpl_load
+from src.fpl_load import BootstrapLoader, LeagueTooLargeError
+from src.questions import WRAPPED_QUESTIONS
+from src.results_store import DEFAULT_PATH, ResultsStore, compute_wrapped_results, from_arrow, to_arrow
+from src.single_flight import SingleFlight
+
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+
+class WrappedService:
+    """
+    The blocking side of the API: finds the latest finalized gameweek and returns the
+    stored results for a league, computing and storing them on a miss.
+    """
+
+    def __init__(self, store, last_event_ttl=60):
+        self.store = store
+        # Coalesce the bootstrap-static lookups and identical league computations from
+        # concurrent requests. Results are kept in the store, not in memory (ttl=0).
+        self._last_event_flight = SingleFlight(max_concurrency=1, ttl=last_event_ttl, sizeof=lambda _: 0)
+        self._results_flight = SingleFlight(max_concurrency=4, ttl=0)
+        # Leagues over MAX_LEAGUE_ENTRIES, so repeat requests don't page through their standings again
+        self._too_large = {}
+
+    def last_event(self):
+        return self._last_event_flight.do("last_event", self._fetch_last_event)
+
+    @staticmethod
+    def _fetch_last_event():
+        bootstrap = BootstrapLoader()
+        # last_event_ttl decides how stale this may be, not url_flight's ttl
+        fpl_load.url_flight.invalidate(bootstrap.url)
+        return bootstrap.get_last_finished_event()
+
+    def payloads(self, league_id, last_event):
+        """
+        Return {question: Arrow IPC payload} for a league at last_event.
+        """
+        payloads = self.store.get_payloads(league_id, last_event)
+        if payloads is not None:
+            return payloads
+        if league_id in self._too_large:
+            raise self._too_large[league_id]
+        try:
+            return self._results_flight.do((league_id, last_event), lambda: self._compute(league_id, last_event))
+        except LeagueTooLargeError as e:
+            self._too_large[league_id] = e
+            raise
+
+    def _compute(self, league_id, last_event):
+        results = compute_wrapped_results(league_id, last_event)
+        if last_event is None:
+            return {question: to_arrow(df) for question, df in results.items()}
+        self.store.put(league_id, last_event, results)
+        return self.store.get_payloads(league_id, last_event)
+
+
+def to_json(payload):
+    """
+    Convert a stored Arrow IPC payload to table-oriented JSON.
+    """
+    return from_arrow(payload).to_json(orient="table", index=False)
+
+
+class GZipContentEncoding(tornado.web.GZipContentEncoding):
+    # Tornado only gzips text types by default, and Arrow IPC compresses about as well as JSON
+    CONTENT_TYPES = tornado.web.GZipContentEncoding.CONTENT_TYPES | {ARROW_CONTENT_TYPE}
+
+
+class BaseHandler(tornado.web.RequestHandler):
+    def initialize(self, service):
+        self.service = service
+
+    def compute_etag(self):
+        # ETags are derived from (league_id, last_event) instead of hashing every body
+        return None
+
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def conditional(self, league_id, *parts):
+        """
+        Set the ETag for a league's results and return (last_event, not_modified).
+        """
+        last_event = await self.run_blocking(self.service.last_event)
+        if last_event is None:
+            # Results change as the first gameweek is played, so they can't be cached
+            self.set_header("Cache-Control", "no-cache")
+            return None, False
+        tag = "-".join(str(p) for p in (league_id, last_event, *parts))
+        # Weak, as the body may be gzipped
+        self.set_header("Etag", f'W/"{tag}"')
+        self.set_header("Cache-Control", "no-cache")
+        if self.check_etag_header():
+            self.set_status(304)
+            return last_event, True
+        return last_event, False
+
+
+class QuestionsHandler(BaseHandler):
+    async def get(self, league_id):
+        league_id = int(league_id)
+        last_event, not_modified = await self.conditional(league_id, "index")
+        if not_modified:
+            return
+        self.write({"league_id": league_id, "last_event": last_event, "questions": list(WRAPPED_QUESTIONS)})
+
+
+class QuestionHandler(BaseHandler):
+    async def get(self, league_id, question):
+        if question not in WRAPPED_QUESTIONS:
+            raise tornado.web.HTTPError(404, f"Unknown question {question}")
+        league_id = int(league_id)
+        arrow = (
+            self.get_argument("format", None) == "arrow"
+            or ARROW_CONTENT_TYPE in self.request.headers.get("Accept", "")
+        )
+        # GZipContentEncoding adds Accept-Encoding
+        self.set_header("Vary", "Accept")
+
+        last_event, not_modified = await self.conditional(league_id, question, "arrow" if arrow else "json")
+        if not_modified:
+            return
+
+        try:
+            payloads = await self.run_blocking(self.service.payloads, league_id, last_event)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                raise tornado.web.HTTPError(404, f"Unknown league {league_id}") from e
+            raise
+        except LeagueTooLargeError as e:
+            raise tornado.web.HTTPError(422, str(e)) from e
+        if arrow:
+            # The stored payload is already Arrow, so it is served without re-encoding
+            self.set_header("Content-Type", ARROW_CONTENT_TYPE)
+            self.write(payloads[question])
+        else:
+            self.set_header("Content-Type", "application/json")
+            self.write(await self.run_blocking(to_json, payloads[question]))
+
+
+class HealthHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.write({"status": "ok"})
+
+
+def make_app(service):
+    return tornado.web.Application(
+        [
+            (r"/healthz", HealthHandler),
+            (r"/leagues/(\d+)/questions", QuestionsHandler, {"service": service}),
+            (r"/leagues/(\d+)/questions/(\w+)", QuestionHandler, {"service": service}),
+        ],
+        transforms=[GZipContentEncoding],
+    )
+
+
+async def serve(port, path, address="127.0.0.1"):
+    app = make_app(WrappedService(ResultsStore(path)))
+    app.listen(port, address)
+    print(json.dumps({"listening": f"http://{address}:{port}/"}), flush=True)
+    await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="SQLite results store.")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.port, args.path, args.address))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
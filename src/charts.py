@@ -0,0 +1,162 @@
+# plotly and pandas are imported inside each builder: they are slow to import and
+# only needed once a league has been loaded.
+
+# Leagues with more entries than this get the large-league versions of the charts
+MAX_LINES = 30
+MAX_BARS = 30
+# Entries drawn individually on the large-league points chart
+TOP_N = 10
+PERCENTILE_BANDS = [(0.1, 0.9), (0.25, 0.75)]
+
+
+def total_points_figure(df, highlight=None, max_lines=MAX_LINES, top_n=TOP_N):
+    """
+    Build the line chart of cumulative points by gameweek, one line per entry.
+
+    Beyond max_lines entries this switches to WebGL traces for the top_n entries and the
+    highlighted entry only, drawn over percentile bands of the whole league.
+    """
+    if df["entry_name"].nunique() > max_lines:
+        return _large_total_points_figure(df, highlight, top_n)
+
+    import plotly.express as px
+
+    fig = px.line(
+        df,
+        x="gameweek",
+        y="points",
+        color="entry_name",
+        title="Total Points by Gameweek",
+    )
+    fig.update_xaxes(title_text="Gameweek")
+    fig.update_yaxes(title_text="Total Points")
+    fig.update_layout(autosize=True, height=800, width=800)
+    return fig
+
+
+def _large_total_points_figure(df, highlight, top_n):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    quantiles = df.groupby("gameweek")["points"].quantile(
+        sorted({q for band in PERCENTILE_BANDS for q in band} | {0.5})
+    ).unstack()
+    gameweeks = quantiles.index.tolist()
+    for low, high in PERCENTILE_BANDS:
+        fig.add_trace(go.Scattergl(
+            x=gameweeks, y=quantiles[low].tolist(), mode="lines",
+            line={"width": 0}, showlegend=False, hoverinfo="skip",
+        ))
+        fig.add_trace(go.Scattergl(
+            x=gameweeks, y=quantiles[high].tolist(), mode="lines",
+            line={"width": 0}, fill="tonexty", fillcolor="rgba(99, 110, 250, 0.15)",
+            name=f"{low:.0%}-{high:.0%} of league",
+        ))
+    fig.add_trace(go.Scattergl(
+        x=gameweeks, y=quantiles[0.5].tolist(), mode="lines",
+        line={"dash": "dash", "color": "grey"}, name="League median",
+    ))
+
+    last_gameweek = df[df["gameweek"] == df["gameweek"].max()]
+    entries = last_gameweek.nlargest(top_n, "points")["entry_name"].tolist()
+    if highlight is not None and highlight not in entries:
+        entries.append(highlight)
+    for entry_name, entry_df in df[df["entry_name"].isin(entries)].groupby("entry_name"):
+        entry_df = entry_df.sort_values("gameweek")
+        fig.add_trace(go.Scattergl(
+            x=entry_df["gameweek"].tolist(), y=entry_df["points"].tolist(), mode="lines",
+            name=entry_name, line={"width": 4 if entry_name == highlight else 1.5},
+        ))
+
+    fig.update_layout(
+        title=f"Total Points by Gameweek (top {top_n} of {df['entry_name'].nunique()} entries)",
+        autosize=True, height=800, width=800,
+    )
+    fig.update_xaxes(title_text="Gameweek")
+    fig.update_yaxes(title_text="Total Points")
+    return fig
+
+
+def _aggregate_bars(df, sort_column, value_columns, max_bars):
+    """
+    Sort df by sort_column and keep the top max_bars entries, averaging the rest into one bar.
+
+    Entries with several rows, such as tied weeks in get_most_points_left_on_bench_week,
+    keep only their first (the earliest event on a tie), so each gets one bar.
+    """
+    import pandas as pd
+
+    if "event" in df.columns:
+        df = df.sort_values([sort_column, "event"], ascending=[False, True], kind="stable")
+    else:
+        df = df.sort_values(sort_column, ascending=False, kind="stable")
+    df = df.drop_duplicates("entry_name")
+    if len(df) <= max_bars:
+        return df
+    top, rest = df.iloc[:max_bars], df.iloc[max_bars:]
+    other = {column: rest[column].mean() for column in value_columns}
+    other["entry_name"] = f"Other {len(rest)} entries (average)"
+    return pd.concat([top, pd.DataFrame([other])], ignore_index=True)
+
+
+def total_bench_points_figure(df, max_bars=MAX_BARS):
+    """
+    Build the bar chart of total points left on the bench by each entry.
+    """
+    import plotly.express as px
+
+    # Order DataFrame from greatest to least points
+    df = _aggregate_bars(df, "bench_points", ["bench_points"], max_bars)
+    fig = px.bar(
+        df, x="entry_name", y="bench_points", title="Most Points Left on Bench"
+    )
+    fig.update_xaxes(title_text="Entry Name")
+    fig.update_yaxes(title_text="Points")
+    return fig
+
+
+def week_bench_points_figure(df, max_bars=MAX_BARS):
+    """
+    Build the bar chart of the most points left on the bench in a single week by each entry.
+    """
+    import plotly.express as px
+
+    # Order DataFrame from greatest to least points
+    df = _aggregate_bars(
+        df, "most_points_left_on_bench", ["most_points_left_on_bench"], max_bars
+    )
+    fig = px.bar(
+        df,
+        x="entry_name",
+        y="most_points_left_on_bench",
+        title="Most Points Left on Bench in a Week",
+    )
+    fig.update_xaxes(title_text="Entry Name")
+    fig.update_yaxes(title_text="Points")
+    return fig
+
+
+def total_vs_bench_points_figure(df, max_bars=MAX_BARS):
+    """
+    Build the stacked bar chart of total points against points left on the bench by each entry.
+    """
+    import plotly.express as px
+
+    # Create a new column that is the sum of total_points and bench_points
+    df["total_and_bench_points"] = df["total_points"] + df["bench_points"]
+
+    # Sort DataFrame by total_and_bench_points from greatest to least
+    df = _aggregate_bars(
+        df, "total_and_bench_points", ["total_points", "bench_points"], max_bars
+    )
+
+    fig = px.bar(
+        df,
+        x="entry_name",
+        y=["total_points", "bench_points"],
+        title="Total Points vs Points Left on Bench",
+    )
+    fig.update_xaxes(title_text="Entry Name")
+    fig.update_yaxes(title_text="Points")
+    return fig
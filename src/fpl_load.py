@@ -1,13 +1,58 @@
 import pandas as pd
 import requests
 import abc
+import json
+import os
+
+from src.rate_limit import RateLimiter
+from src.single_flight import SingleFlight
+
+DEFAULT_BASE_URL = "https://fantasy.premierleague.com/api/"
+# Loading a league fetches every entry's history, so leagues are capped unless a caller
+# asks for every page of the standings (e.g. sketch_league, which streams the histories)
+MAX_LEAGUE_ENTRIES = 500
+
+# Process-wide, so concurrent sessions loading the same league share their requests.
+# Raw response bytes are cached rather than parsed JSON so callers can't mutate a shared copy.
+url_flight = SingleFlight(max_concurrency=8, max_bytes=128 * 2**20, ttl=300)
+league_flight = SingleFlight(
+    max_concurrency=4,
+    max_bytes=256 * 2**20,
+    ttl=300,
+    sizeof=lambda df: int(df.memory_usage(deep=True).sum()),
+)
+# Unlimited unless a process sets a rate, e.g. the cache warmer
+request_limiter = RateLimiter()
+
+
+class LeagueTooLargeError(ValueError):
+    """
+    Raised for a league with more than MAX_LEAGUE_ENTRIES entries, unless every page was asked for.
+    """
+
+
+def _get(url):
+    request_limiter.wait()
+    response = requests.get(url, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
+def fetch_json(url, refresh=False):
+    """
+    GET url and parse the JSON response, sharing in-flight and recent requests for the same url.
+    """
+    return json.loads(url_flight.do(url, lambda: _get(url), refresh=refresh))
 
 
 class FPLDataLoader:
     __metaclass__ = abc.ABCMeta
 
-    def __init__(self):
-        self.base_url = "https://fantasy.premierleague.com/api/"
+    def __init__(self, refresh=False):
+        # Overridable so the loaders can be pointed at a local stub of the API
+        self.base_url = os.environ.get("FPL_API_BASE_URL", DEFAULT_BASE_URL)
+        # Skip url_flight's cached responses, e.g. when results are about to be stored
+        self.refresh = refresh
         self.url = None
         self.json = None
 
@@ -30,7 +75,7 @@ class FPLDataLoader:
 
     @abc.abstractmethod
     def request_data(self):
-        self.json = requests.get(self.url).json()
+        self.json = fetch_json(self.url, refresh=self.refresh)
 
     @abc.abstractmethod
     def format_request(self) -> str:
@@ -59,11 +104,28 @@ class StandingsLoader(FPLDataLoader):
         "entry_name": "entry_name",
     }
 
-    def __init__(self, league_id):
-        super().__init__()
+    def __init__(self, league_id, refresh=False, all_pages=False):
+        super().__init__(refresh)
         self.league_id = league_id
+        self.all_pages = all_pages
         self.url = self.base_url + f"leagues-classic/{league_id}/standings/"
 
+    def request_data(self):
+        # The API pages standings 50 entries at a time, so follow has_next to get every entry
+        results = []
+        page = 1
+        while True:
+            standings = fetch_json(f"{self.url}?page_standings={page}", refresh=self.refresh)["standings"]
+            results.extend(standings["results"])
+            if not standings.get("has_next"):
+                break
+            if not self.all_pages and len(results) >= MAX_LEAGUE_ENTRIES:
+                raise LeagueTooLargeError(
+                    f"League {self.league_id} has more than {MAX_LEAGUE_ENTRIES} entries"
+                )
+            page += 1
+        self.json = {"standings": {"results": results}}
+
     def format_request(self):
         self.data = self.json["standings"]["results"]
 
@@ -89,8 +151,8 @@ class HistoryLoader(FPLDataLoader):
         "entry": "entry",
     }
 
-    def __init__(self, entry_id):
-        super().__init__()
+    def __init__(self, entry_id, refresh=False):
+        super().__init__(refresh)
         self.entry_id = entry_id
         self.url = self.base_url + f"entry/{entry_id}/history/"
 
@@ -104,6 +166,42 @@ class HistoryLoader(FPLDataLoader):
         return df
 
 
+class BootstrapLoader(FPLDataLoader):
+    events_schema_mapping = {
+        "id": "event",
+        "name": "event_name",
+        "deadline_time": "deadline_time",
+        "finished": "finished",
+        "data_checked": "data_checked",
+        "is_previous": "is_previous",
+        "is_current": "is_current",
+        "is_next": "is_next",
+    }
+
+    def __init__(self, refresh=False):
+        super().__init__(refresh)
+        self.url = self.base_url + "bootstrap-static/"
+
+    def format_request(self):
+        self.data = self.json["events"]
+
+    def format_data(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.data)
+        df = df[list(self.events_schema_mapping)]
+        df = df.rename(columns=self.events_schema_mapping)
+        return df
+
+    def get_last_finished_event(self):
+        """
+        Return the latest gameweek that has finished and had its data checked, or None before GW1 is final.
+        """
+        df = self.get_data()
+        finished = df[df["finished"] & df["data_checked"]]
+        if finished.empty:
+            return None
+        return int(finished["event"].max())
+
+
 class LeagueHistoryLoader:
     league_history_schema_mapping = {
         "event": "event",
@@ -122,12 +220,12 @@ class LeagueHistoryLoader:
         "entry_name": "entry_name",
     }
 
-    def __init__(self, league_id):
+    def __init__(self, league_id, refresh=False):
         self.league_id = league_id
-        self.standings = StandingsLoader(league_id)
+        self.standings = StandingsLoader(league_id, refresh)
         self.standings_df = self.standings.get_data()
         self.entry_ids = self.standings_df["entry"].tolist()
-        self.histories = [HistoryLoader(entry_id) for entry_id in self.entry_ids]
+        self.histories = [HistoryLoader(entry_id, refresh) for entry_id in self.entry_ids]
         self.history_dfs = [history.get_data() for history in self.histories]
 
     def get_data(self):
@@ -135,4 +233,18 @@ class LeagueHistoryLoader:
         history_df = history_df.merge(self.standings_df, on="entry")
         # filter history_df to only include the keys in league_history_schema_mapping
         history_df = history_df.rename(columns=self.league_history_schema_mapping)
+        history_df["league_id"] = self.league_id
         return history_df
+
+
+def load_league_history(league_id, refresh=False):
+    """
+    Return LeagueHistoryLoader(league_id).get_data(), sharing the load between concurrent callers.
+
+    Each caller gets its own copy, so the shared result can't be modified. refresh
+    skips the cached league and API responses, and fetches every one again.
+    """
+    df = league_flight.do(
+        league_id, lambda: LeagueHistoryLoader(league_id, refresh).get_data(), refresh=refresh
+    )
+    return df.copy()
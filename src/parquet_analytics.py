@@ -0,0 +1,141 @@
+"""
+Run the questions across many leagues at once, out of core, over a directory of Parquet histories.
+
+Histories are hive partitioned by league: <root>/league_id=<id>/history.parquet.
+DuckDB scans the files in parallel, spills to disk above its memory limit and the
+results are streamed back in batches, so the dataset never has to fit in pandas.
+
+Usage:
+    python -m src.parquet_analytics export histories/ 741068
+    python -m src.parquet_analytics query histories/ bench_points_percentiles --memory-limit 4GB --threads 8
+"""
+import argparse
+import os
+import sys
+
+import duckdb
+
+from src.fpl_load import load_league_history
+from src.questions import (
+    WRAPPED_QUESTIONS,
+    get_bench_points_percentiles,
+    get_league_winner_transfer_hits,
+)
+
+QUESTIONS = {
+    **WRAPPED_QUESTIONS,
+    "bench_points_percentiles": get_bench_points_percentiles,
+    "league_winner_transfer_hits": get_league_winner_transfer_hits,
+}
+
+
+def write_league_history(df, root):
+    """
+    Write a history DataFrame (as returned by LeagueHistoryLoader.get_data) into root, one partition per league.
+    """
+    for league_id in df["league_id"].unique():
+        directory = os.path.join(root, f"league_id={league_id}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "history.parquet")
+        # league_id comes back from the partition path, so it isn't stored in the file.
+        # Write then rename, so a concurrent scan never sees a partial file.
+        with duckdb.connect() as connection:
+            connection.register("df", df)
+            connection.sql(
+                f"SELECT * EXCLUDE (league_id) FROM df WHERE league_id = {int(league_id)}"
+            ).write_parquet(path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+
+def export_leagues(league_ids, root):
+    """
+    Load each league from the API and write its history into root.
+    """
+    for league_id in league_ids:
+        write_league_history(load_league_history(league_id), root)
+
+
+class ParquetHistories:
+    """
+    A DuckDB scan over a directory of partitioned Parquet league histories.
+
+    threads limits the parallel scan (defaults to every core), memory_limit caps DuckDB's
+    memory (e.g. "4GB") and temp_directory is where it spills once over the limit.
+    """
+
+    def __init__(self, root, threads=None, memory_limit=None, temp_directory=None):
+        config = {}
+        if threads is not None:
+            config["threads"] = threads
+        if memory_limit is not None:
+            config["memory_limit"] = memory_limit
+        if temp_directory is not None:
+            config["temp_directory"] = temp_directory
+        self.root = root
+        self.connection = duckdb.connect(config=config)
+        self.relation = self.connection.read_parquet(
+            os.path.join(root, "*", "*.parquet"), hive_partitioning=True
+        )
+
+    def query(self, question):
+        """
+        Return the lazy DuckDB relation answering a question in QUESTIONS over every league.
+        """
+        return QUESTIONS[question](self.relation)
+
+    def stream(self, question, batch_size=100_000):
+        """
+        Yield the answer to a question as DataFrames of at most batch_size rows.
+        """
+        relation = self.query(question)
+        # to_arrow_reader replaced fetch_arrow_reader in newer DuckDB releases
+        reader = getattr(relation, "to_arrow_reader", None) or relation.fetch_arrow_reader
+        for batch in reader(batch_size):
+            yield batch.to_pandas()
+
+    def to_parquet(self, question, path):
+        """
+        Write the answer to a question straight to a Parquet file, without loading it into Python.
+        """
+        self.query(question).write_parquet(path)
+
+    def close(self):
+        self.connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export = subparsers.add_parser("export", help="Write leagues' histories from the API into root.")
+    export.add_argument("root")
+    export.add_argument("league_ids", type=int, nargs="+")
+
+    query = subparsers.add_parser("query", help="Answer a question over every league in root.")
+    query.add_argument("root")
+    query.add_argument("question", choices=sorted(QUESTIONS))
+    query.add_argument("--threads", type=int)
+    query.add_argument("--memory-limit", help="e.g. 4GB")
+    query.add_argument("--temp-directory", help="Where DuckDB spills once over the memory limit.")
+    query.add_argument("--batch-size", type=int, default=100_000)
+    query.add_argument("--output", help="Write the answer to this Parquet file instead of stdout as CSV.")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_leagues(args.league_ids, args.root)
+        return 0
+
+    histories = ParquetHistories(args.root, args.threads, args.memory_limit, args.temp_directory)
+    try:
+        if args.output:
+            histories.to_parquet(args.question, args.output)
+        else:
+            for i, batch in enumerate(histories.stream(args.question, args.batch_size)):
+                batch.to_csv(sys.stdout, header=i == 0, index=False)
+    finally:
+        histories.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
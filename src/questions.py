@@ -1,6 +1,28 @@
 import duckdb
 
-# Import typing for dictionary
+# The questions partition by league_id, so the same queries answer one league's
+# DataFrame or a dataset of many leagues (see src/parquet_analytics.py).
+# Histories without a league_id column are treated as a single league, league 0.
+
+
+def _query(duckdb_df, query):
+    """
+    Run query with duckdb_df available as the duckdb_df table.
+
+    A DataFrame gives back a DataFrame, queried on its own connection: DuckDB's shared
+    default connection hangs when used from several threads, e.g. the API's executor.
+    A DuckDB relation, such as a scan over Parquet files, gives back a lazy relation on
+    the same connection so results can be streamed.
+    """
+    if isinstance(duckdb_df, duckdb.DuckDBPyRelation):
+        if "league_id" not in duckdb_df.columns:
+            duckdb_df = duckdb_df.project("*, 0 AS league_id")
+        return duckdb_df.query("duckdb_df", query)
+    with duckdb.connect() as connection:
+        connection.register("history", duckdb_df)
+        league_id = "" if "league_id" in duckdb_df.columns else ", 0 AS league_id"
+        connection.execute(f"CREATE TEMP VIEW duckdb_df AS SELECT *{league_id} FROM history")
+        return connection.sql(query).df()
 
 
 def get_total_points_left_on_bench(duckdb_df):
@@ -8,21 +30,24 @@ def get_total_points_left_on_bench(duckdb_df):
     This function returns a DataFrame with the total points left on the bench for each player and entry,
     ordered by the total points left on the bench in descending order.
     """
-    return duckdb.query(
+    return _query(
+        duckdb_df,
         """
         SELECT 
+            league_id,
             player_name, 
             entry_name, 
             SUM(points_on_bench) AS bench_points
         FROM 
             duckdb_df
         GROUP BY 
+            league_id,
             player_name, 
             entry_name
         ORDER BY 
             bench_points DESC
     """
-    ).to_df()
+    )
 
 
 def get_most_points_left_on_bench_week(duckdb_df):
@@ -30,9 +55,11 @@ def get_most_points_left_on_bench_week(duckdb_df):
     This function returns a DataFrame with the most points left on the bench in a week for each player and entry,
     along with the week (event) when this happened, ordered by the most points left on the bench in descending order.
     """
-    return duckdb.query(
+    return _query(
+        duckdb_df,
         """
         SELECT 
+            d.league_id,
             d.player_name, 
             d.entry_name, 
             d.points_on_bench AS most_points_left_on_bench, 
@@ -41,48 +68,85 @@ def get_most_points_left_on_bench_week(duckdb_df):
             duckdb_df d
         JOIN (
             SELECT 
+                league_id,
                 player_name, 
                 entry_name, 
                 MAX(points_on_bench) AS max_points
             FROM 
                 duckdb_df
             GROUP BY 
+                league_id,
                 player_name, 
                 entry_name
-        ) m ON d.player_name = m.player_name AND d.entry_name = m.entry_name AND d.points_on_bench = m.max_points
+        ) m ON d.league_id = m.league_id AND d.player_name = m.player_name AND d.entry_name = m.entry_name AND d.points_on_bench = m.max_points
         ORDER BY 
             most_points_left_on_bench DESC
     """
-    ).to_df()
+    )
 
 
 def get_biggest_difference(duckdb_df):
     """
     This function returns a DataFrame with the biggest difference in event points between two players in a single week,
     along with the week (event) when this happened, ordered by the difference in descending order.
+    The biggest difference in a week is between its best and worst players, or when one player owns both extremes
+    (with two entries, or in a week everyone scores the same) between one of the top two and bottom two players,
+    so this compares those rather than every pair of players. Ties go to the earliest week and first player names.
     """
-    return duckdb.query(
+    return _query(
+        duckdb_df,
         """
+        WITH players AS (
+            SELECT 
+                league_id,
+                event, 
+                player_name,
+                ARG_MAX(entry_name, event_points) AS best_entry,
+                MAX(event_points) AS best_points,
+                ARG_MIN(entry_name, event_points) AS worst_entry,
+                MIN(event_points) AS worst_points
+            FROM 
+                duckdb_df
+            GROUP BY 
+                league_id,
+                event,
+                player_name
+        ),
+        ranked AS (
+            SELECT 
+                *,
+                ROW_NUMBER() OVER (PARTITION BY league_id, event ORDER BY best_points DESC, player_name) AS best_rank,
+                ROW_NUMBER() OVER (PARTITION BY league_id, event ORDER BY worst_points ASC, player_name) AS worst_rank
+            FROM 
+                players
+        )
         SELECT 
+            a.league_id,
             a.event, 
             a.player_name AS player1, 
-            a.entry_name AS entry1, 
-            a.event_points AS points1,
+            a.best_entry AS entry1, 
+            a.best_points AS points1,
             b.player_name AS player2, 
-            b.entry_name AS entry2, 
-            b.event_points AS points2,
-            ABS(a.event_points - b.event_points) AS difference
+            b.worst_entry AS entry2, 
+            b.worst_points AS points2,
+            a.best_points - b.worst_points AS difference
         FROM 
-            duckdb_df a, 
-            duckdb_df b
-        WHERE 
+            ranked a
+        JOIN 
+            ranked b 
+        ON 
+            a.league_id = b.league_id AND 
             a.event = b.event AND 
             a.player_name != b.player_name
+        WHERE 
+            a.best_rank <= 2 AND 
+            b.worst_rank <= 2
+        QUALIFY 
+            ROW_NUMBER() OVER (PARTITION BY a.league_id ORDER BY difference DESC, a.event, player1, player2) = 1
         ORDER BY 
             difference DESC
-        LIMIT 1
     """
-    ).to_df()
+    )
 
 
 def get_points_by_gameweek(duckdb_df):
@@ -90,26 +154,29 @@ def get_points_by_gameweek(duckdb_df):
     This function returns a DataFrame with the points gained by a specific player and entry by gameweek,
     ordered by the gameweek in ascending order.
     """
-    return duckdb.query(
+    return _query(
+        duckdb_df,
         """
         SELECT
+            league_id,
             player_name,
             entry_name,
             event AS gameweek, 
-            SUM(event_points) OVER (PARTITION BY player_name, entry_name ORDER BY event) AS points
+            SUM(event_points) OVER (PARTITION BY league_id, player_name, entry_name ORDER BY event) AS points
         FROM 
             duckdb_df
         ORDER BY 
             gameweek ASC
     """
-    ).to_df()
+    )
 
 
 def get_most_frequent_last_rank(duckdb_df):
     """
     This function returns a DataFrame with the player who has been ranked last for each week throughout the season the most times.
     """
-    return duckdb.query(
+    return _query(
+        duckdb_df,
         """
         SELECT 
             player_name, 
@@ -129,16 +196,18 @@ def get_most_frequent_last_rank(duckdb_df):
             times_last_rank DESC
         LIMIT 1
     """
-    ).to_df()
+    )
 
 
 def get_total_points_and_bench_points(duckdb_df):
     """
     This function returns a DataFrame with the total points and total points left on the bench for each player and team for the season.
     """
-    return duckdb.query(
+    return _query(
+        duckdb_df,
         """
         SELECT 
+            league_id,
             player_name, 
             entry_name, 
             SUM(points_on_bench) AS bench_points, 
@@ -146,50 +215,56 @@ def get_total_points_and_bench_points(duckdb_df):
         FROM 
             duckdb_df
         GROUP BY 
+            league_id,
             player_name, 
             entry_name
     """
-    ).to_df()
+    )
 
 
 def get_player_best_rank_event(duckdb_df):
     """
     This function returns a DataFrame with the player_name, entry_name, best_rank, and the event on which that best_rank happened
     """
-    return duckdb.query("""
+    return _query(duckdb_df, """
         WITH total_points AS (
             SELECT 
+                league_id,
                 event, 
                 event_points, 
                 entry_name, 
                 player_name,
-                SUM(event_points) OVER (PARTITION BY player_name, entry_name ORDER BY event) AS total_points
+                SUM(event_points) OVER (PARTITION BY league_id, player_name, entry_name ORDER BY event) AS total_points
             FROM
                 duckdb_df
         ),
         ranks AS (
             SELECT 
+                league_id,
                 event, 
                 event_points, 
                 entry_name, 
                 player_name,
                 total_points,
-                RANK() OVER (PARTITION BY event ORDER BY total_points DESC) as rank
+                RANK() OVER (PARTITION BY league_id, event ORDER BY total_points DESC) as rank
             FROM
                 total_points
         ),
         best_ranks AS (
             SELECT 
+                league_id,
                 player_name,
                 entry_name,
                 MIN(rank) as best_rank
             FROM 
                 ranks
             GROUP BY
+                league_id,
                 player_name,
                 entry_name
         )
         SELECT 
+            br.league_id,
             br.player_name,
             br.entry_name,
             br.best_rank,
@@ -199,56 +274,64 @@ def get_player_best_rank_event(duckdb_df):
         JOIN 
             ranks r
         ON 
+            br.league_id = r.league_id AND 
             br.player_name = r.player_name AND 
             br.entry_name = r.entry_name AND 
             br.best_rank = r.rank
         GROUP BY
+            br.league_id,
             br.player_name,
             br.entry_name,
             br.best_rank
         ORDER BY 
+            br.league_id,
             br.entry_name
-    """).to_df()
+    """)
 
 
 def get_player_worst_rank_event(duckdb_df):
     """
     This function returns a DataFrame with the player_name, entry_name, worst_rank, and the event on which that worst_rank happened
     """
-    return duckdb.query("""
+    return _query(duckdb_df, """
         WITH total_points AS (
             SELECT 
+                league_id,
                 event, 
                 event_points, 
                 entry_name, 
                 player_name,
-                SUM(event_points) OVER (PARTITION BY player_name, entry_name ORDER BY event) AS total_points
+                SUM(event_points) OVER (PARTITION BY league_id, player_name, entry_name ORDER BY event) AS total_points
             FROM
                 duckdb_df
         ),
         ranks AS (
             SELECT 
+                league_id,
                 event, 
                 event_points, 
                 entry_name, 
                 player_name,
                 total_points,
-                RANK() OVER (PARTITION BY event ORDER BY total_points DESC) as rank
+                RANK() OVER (PARTITION BY league_id, event ORDER BY total_points DESC) as rank
             FROM
                 total_points
         ),
         worst_ranks AS (
             SELECT 
+                league_id,
                 player_name,
                 entry_name,
                 MAX(rank) as worst_rank
             FROM 
                 ranks
             GROUP BY
+                league_id,
                 player_name,
                 entry_name
         )
         SELECT 
+            wr.league_id,
             wr.player_name,
             wr.entry_name,
             wr.worst_rank,
@@ -258,16 +341,19 @@ def get_player_worst_rank_event(duckdb_df):
         JOIN 
             ranks r
         ON 
+            wr.league_id = r.league_id AND 
             wr.player_name = r.player_name AND 
             wr.entry_name = r.entry_name AND 
             wr.worst_rank = r.rank
         GROUP BY
+            wr.league_id,
             wr.player_name,
             wr.entry_name,
             wr.worst_rank
         ORDER BY 
+            wr.league_id,
             wr.player_name
-    """).to_df()
+    """)
 
 
 def get_best_player_tally(duckdb_df):
@@ -283,18 +369,20 @@ def get_best_player_tally(duckdb_df):
     | player1     | entry1     | 5                    | 1, 3, 5, 7, 9       | {1: 10, 3: 15, 5: 20, ...}|
     | player2     | entry2     | 3                    | 2, 4, 6             | {2: 12, 4: 18, 6: 22}     |
     """
-    return duckdb.query("""
+    return _query(duckdb_df, """
         WITH best_player AS (
             SELECT 
+                league_id,
                 event, 
                 player_name, 
                 entry_name, 
                 event_points - event_transfers_cost AS net_points,
-                RANK() OVER (PARTITION BY event ORDER BY net_points DESC) as rank
+                RANK() OVER (PARTITION BY league_id, event ORDER BY net_points DESC) as rank
             FROM 
                 duckdb_df
         )
         SELECT 
+            league_id,
             player_name, 
             entry_name, 
             COUNT(*) AS game_weeks_won_total,
@@ -305,13 +393,14 @@ def get_best_player_tally(duckdb_df):
         WHERE 
             rank = 1
         GROUP BY 
+            league_id,
             player_name, 
             entry_name
         HAVING 
             COUNT(*) > 0
         ORDER BY 
             game_weeks_won_total DESC
-    """).to_df()
+    """)
 
 
 def get_worst_player_tally(duckdb_df):
@@ -327,18 +416,20 @@ def get_worst_player_tally(duckdb_df):
     | player1     | entry1     | 5                     | 1, 3, 5, 7, 9        | {1: 2, 3: 1, 5: 3, ...}    |
     | player2     | entry2     | 3                     | 2, 4, 6              | {2: 0, 4: 1, 6: 2}         |
     """
-    return duckdb.query("""
+    return _query(duckdb_df, """
         WITH worst_player AS (
             SELECT 
+                league_id,
                 event, 
                 player_name, 
                 entry_name, 
                 event_points - event_transfers_cost AS net_points,
-                RANK() OVER (PARTITION BY event ORDER BY net_points ASC) as rank
+                RANK() OVER (PARTITION BY league_id, event ORDER BY net_points ASC) as rank
             FROM 
                 duckdb_df
         )
         SELECT 
+            league_id,
             player_name, 
             entry_name, 
             COUNT(*) AS game_weeks_lost_total,
@@ -349,13 +440,14 @@ def get_worst_player_tally(duckdb_df):
         WHERE 
             rank = 1
         GROUP BY 
+            league_id,
             player_name, 
             entry_name
         HAVING 
             COUNT(*) > 0
         ORDER BY 
             game_weeks_lost_total DESC
-    """).to_df()
+    """)
 
 
 def get_transfer_hits(duckdb_df):
@@ -363,8 +455,9 @@ def get_transfer_hits(duckdb_df):
     This function returns a DataFrame for each game week showing which
     players have had event_transfer_costs greater than 0.
     """
-    return duckdb.query("""
+    return _query(duckdb_df, """
         SELECT 
+            league_id,
             event, 
             player_name, 
             entry_name, 
@@ -375,7 +468,7 @@ def get_transfer_hits(duckdb_df):
             event_transfers_cost > 0
         ORDER BY
             event
-    """).to_df()
+    """)
 
 
 def get_boring(duckdb_df):
@@ -384,34 +477,38 @@ def get_boring(duckdb_df):
     If player X has never been the best AND never been the worst in a single gameweek,
     they should be included in the result.
     """
-    return duckdb.query("""
+    return _query(duckdb_df, """
         WITH best_player AS (
             SELECT 
+                league_id,
                 event, 
                 player_name, 
                 entry_name, 
                 event_points - event_transfers_cost AS net_points,
-                RANK() OVER (PARTITION BY event ORDER BY net_points DESC) AS rank
+                RANK() OVER (PARTITION BY league_id, event ORDER BY net_points DESC) AS rank
             FROM 
                 duckdb_df
         ),
         worst_player AS (
             SELECT 
+                league_id,
                 event, 
                 player_name, 
                 entry_name, 
                 event_points - event_transfers_cost AS net_points,
-                RANK() OVER (PARTITION BY event ORDER BY net_points ASC) AS rank
+                RANK() OVER (PARTITION BY league_id, event ORDER BY net_points ASC) AS rank
             FROM 
                 duckdb_df
         )
         SELECT 
             DISTINCT
+                all_players.league_id,
                 all_players.player_name, 
                 all_players.entry_name
         FROM 
             (
                 SELECT 
+                    league_id,
                     player_name, 
                     entry_name, 
                     COUNT(*) AS game_weeks_won_total
@@ -420,12 +517,14 @@ def get_boring(duckdb_df):
                 WHERE 
                     rank = 1
                 GROUP BY 
+                    league_id,
                     player_name, 
                     entry_name
             ) AS best
         FULL OUTER JOIN 
             (
                 SELECT 
+                    league_id,
                     player_name, 
                     entry_name, 
                     COUNT(*) AS game_weeks_lost_total
@@ -434,26 +533,121 @@ def get_boring(duckdb_df):
                 WHERE 
                     rank = 1
                 GROUP BY 
+                    league_id,
                     player_name, 
                     entry_name
             ) AS worst
         ON 
+            best.league_id = worst.league_id AND 
             best.player_name = worst.player_name AND 
             best.entry_name = worst.entry_name
         FULL OUTER JOIN 
             (
                 SELECT 
+                    league_id,
                     player_name, 
                     entry_name
                 FROM 
                     duckdb_df
             ) AS all_players
         ON 
+            best.league_id = all_players.league_id AND 
             best.player_name = all_players.player_name AND 
             best.entry_name = all_players.entry_name OR
+            worst.league_id = all_players.league_id AND 
             worst.player_name = all_players.player_name AND 
             worst.entry_name = all_players.entry_name
         WHERE 
             best.game_weeks_won_total IS NULL AND 
             worst.game_weeks_lost_total IS NULL
-    """).to_df()
+    """)
+
+
+# The questions answered on the wrapped page, keyed by the name their results are stored under.
+WRAPPED_QUESTIONS = {
+    "worst_player_tally": get_worst_player_tally,
+    "best_player_tally": get_best_player_tally,
+    "boring": get_boring,
+    "transfer_hits": get_transfer_hits,
+    "points_by_gameweek": get_points_by_gameweek,
+    "player_worst_rank_event": get_player_worst_rank_event,
+    "player_best_rank_event": get_player_best_rank_event,
+    "total_points_left_on_bench": get_total_points_left_on_bench,
+    "total_points_and_bench_points": get_total_points_and_bench_points,
+    "most_points_left_on_bench_week": get_most_points_left_on_bench_week,
+    "biggest_difference": get_biggest_difference,
+}
+
+
+def get_wrapped_results(duckdb_df):
+    """
+    This function answers every question in WRAPPED_QUESTIONS for a league's history,
+    returning a dictionary of question name to result DataFrame.
+    The league_id column is dropped, as every row belongs to the same league.
+    """
+    return {
+        name: question(duckdb_df).drop(columns="league_id")
+        for name, question in WRAPPED_QUESTIONS.items()
+    }
+
+
+def get_bench_points_percentiles(duckdb_df):
+    """
+    This function returns a single row DataFrame with percentiles of the season's total points left on the bench
+    per entry, across every league in duckdb_df. Entries in more than one league are only counted once.
+    """
+    return _query(duckdb_df, """
+        WITH entry_events AS (
+            SELECT 
+                DISTINCT
+                    entry, 
+                    event, 
+                    points_on_bench
+            FROM 
+                duckdb_df
+        ),
+        entry_bench AS (
+            SELECT 
+                entry, 
+                SUM(points_on_bench) AS bench_points
+            FROM 
+                entry_events
+            GROUP BY 
+                entry
+        )
+        SELECT 
+            COUNT(*) AS entries,
+            QUANTILE_CONT(bench_points, 0.1) AS p10,
+            QUANTILE_CONT(bench_points, 0.25) AS p25,
+            QUANTILE_CONT(bench_points, 0.5) AS p50,
+            QUANTILE_CONT(bench_points, 0.75) AS p75,
+            QUANTILE_CONT(bench_points, 0.9) AS p90,
+            MAX(bench_points) AS max
+        FROM 
+            entry_bench
+    """)
+
+
+def get_league_winner_transfer_hits(duckdb_df):
+    """
+    This function returns a DataFrame with how many transfer hits each league's winner took,
+    and how many points they cost, one row per league.
+    """
+    return _query(duckdb_df, """
+        SELECT 
+            league_id,
+            player_name, 
+            entry_name, 
+            COUNT(*) FILTER (WHERE event_transfers_cost > 0) AS hits_taken,
+            SUM(event_transfers_cost) AS hit_points
+        FROM 
+            duckdb_df
+        WHERE 
+            league_rank = 1
+        GROUP BY 
+            league_id,
+            player_name, 
+            entry_name
+        ORDER BY 
+            league_id
+    """)
@@ -0,0 +1,200 @@
+import numpy as np
+
+from src.fpl_load import HistoryLoader, StandingsLoader
+
+
+class PointsSketch:
+    """
+    A streaming sketch of the league's cumulative points distribution for every gameweek.
+
+    Cumulative points are counted in fixed-width buckets, so memory depends on the points
+    range and bucket_width, never on the number of entries: at most
+    events x (points range / bucket_width) counters.
+
+    Ranks follow RANK() OVER (ORDER BY total_points DESC): one more than the number of
+    entries with strictly more points. Entries in higher buckets are counted exactly, so the
+    only uncertainty is which of the other entries in the same bucket are ahead. Every rank
+    comes with that error bound, which is at most the number of other entries in the bucket
+    and is 0 with the default bucket_width of 1, since FPL points are integers.
+    """
+
+    def __init__(self, bucket_width=1):
+        self.bucket_width = bucket_width
+        # counts[event, bucket - lowest_bucket], grown as later gameweeks and new totals arrive.
+        # Buckets are offset rather than clipped at 0, as a bad first gameweek can leave a negative total.
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.lowest_bucket = 0
+        self._above = None
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes
+
+    def _grow(self, n_events, low_bucket, high_bucket):
+        n_rows, n_columns = self.counts.shape
+        if n_columns:
+            low_bucket = min(low_bucket, self.lowest_bucket)
+            high_bucket = max(high_bucket, self.lowest_bucket + n_columns - 1)
+        n_events = max(n_events, n_rows)
+        if (n_events, low_bucket, high_bucket - low_bucket + 1) == (n_rows, self.lowest_bucket, n_columns):
+            return
+        counts = np.zeros((n_events, high_bucket - low_bucket + 1), dtype=np.int64)
+        start = self.lowest_bucket - low_bucket
+        counts[:n_rows, start:start + n_columns] = self.counts
+        self.counts = counts
+        self.lowest_bucket = low_bucket
+
+    def _buckets(self, points):
+        return np.floor_divide(np.asarray(points, dtype=np.int64), self.bucket_width)
+
+    def add(self, events, cumulative_points):
+        """
+        Count cumulative points totals at their events, one total per entry per event.
+        """
+        events = np.asarray(events, dtype=np.int64)
+        buckets = self._buckets(cumulative_points)
+        if len(events) == 0:
+            return
+        self._grow(events.max() + 1, buckets.min(), buckets.max())
+        np.add.at(self.counts, (events, buckets - self.lowest_bucket), 1)
+        self._above = None
+
+    def add_history(self, history_df):
+        """
+        Count one entry's history, shaped like HistoryLoader.get_data.
+
+        Cumulative points are summed from event_points, as the rank questions do.
+        """
+        history_df = history_df.sort_values("event")
+        self.add(history_df["event"], history_df["event_points"].cumsum())
+
+    def merge(self, other):
+        """
+        Add the counts from another sketch with the same bucket_width, e.g. one built in another process.
+        """
+        if other.bucket_width != self.bucket_width:
+            raise ValueError("Can only merge sketches with the same bucket_width")
+        n_rows, n_columns = other.counts.shape
+        if n_columns == 0:
+            return
+        self._grow(n_rows, other.lowest_bucket, other.lowest_bucket + n_columns - 1)
+        start = other.lowest_bucket - self.lowest_bucket
+        self.counts[:n_rows, start:start + n_columns] += other.counts
+        self._above = None
+
+    def entries(self, event):
+        """
+        Return how many entries have a total for event.
+        """
+        if event >= self.counts.shape[0]:
+            return 0
+        return int(self.counts[event].sum())
+
+    def rank(self, events, points):
+        """
+        Return (estimated ranks, error bounds) for the given cumulative points at each event.
+
+        The estimate assumes the other entries in the same bucket are spread evenly across it,
+        and the true rank is always within the error bound of it. Raises ValueError for events
+        the sketch has no entries for, e.g. a gameweek played after it was built.
+        """
+        events = np.asarray(events, dtype=np.int64)
+        counted = self.counts.sum(axis=1) > 0
+        known = (events >= 0) & (events < len(counted))
+        known[known] = counted[events[known]]
+        if not known.all():
+            missing = ", ".join(str(event) for event in sorted(set(events[~known].tolist())))
+            raise ValueError(f"No entries counted for gameweek {missing}")
+
+        if self._above is None:
+            # above[event, bucket] = entries in strictly higher buckets
+            suffix = np.cumsum(self.counts[:, ::-1], axis=1)[:, ::-1]
+            self._above = np.concatenate(
+                [suffix[:, 1:], np.zeros((self.counts.shape[0], 1), dtype=np.int64)], axis=1
+            )
+
+        points = np.asarray(points, dtype=np.int64)
+        columns = self._buckets(points) - self.lowest_bucket
+        inside = np.clip(columns, 0, self.counts.shape[1] - 1)
+        # Totals outside the counted range are below or above every entry
+        above = np.where(columns < 0, self.counts[events].sum(axis=1), self._above[events, inside])
+        above = np.where(columns >= self.counts.shape[1], 0, above)
+        in_bucket = np.where(columns == inside, self.counts[events, inside], 0)
+        # The entry itself is in its bucket, the rest may or may not be ahead of it
+        others = np.maximum(in_bucket - 1, 0)
+
+        if self.bucket_width == 1:
+            return above + 1, np.zeros(len(events))
+        share_ahead = (self.bucket_width - 1 - points % self.bucket_width) / self.bucket_width
+        low, high = above + 1, above + 1 + others
+        estimate = np.clip(np.rint(low + others * share_ahead), low, high)
+        return estimate, np.maximum(estimate - low, high - estimate)
+
+    def percentile(self, events, points):
+        """
+        Return (percentiles, error bounds): the share of the league at or below each total, from 0 to 100.
+        """
+        events = np.asarray(events, dtype=np.int64)
+        ranks, errors = self.rank(events, points)
+        totals = self.counts[events].sum(axis=1)
+        return 100 * (totals - ranks + 1) / totals, 100 * errors / totals
+
+
+def sketch_league(league_id, bucket_width=1):
+    """
+    Build a PointsSketch for a league, streaming its entries' histories one at a time
+    rather than holding every history in memory. Every page of the standings is read,
+    so the sketch counts the whole league, however far past MAX_LEAGUE_ENTRIES it goes.
+    """
+    sketch = PointsSketch(bucket_width)
+    for entry_id in StandingsLoader(league_id, all_pages=True).get_data()["entry"]:
+        sketch.add_history(HistoryLoader(entry_id).get_data())
+    return sketch
+
+
+def _cumulative_ranks(sketch, duckdb_df):
+    df = duckdb_df[["player_name", "entry_name", "event", "event_points"]].sort_values("event")
+    df["total_points"] = df.groupby(["player_name", "entry_name"])["event_points"].cumsum()
+    df["rank"], df["rank_error"] = sketch.rank(df["event"], df["total_points"])
+    return df
+
+
+def _rank_events(df, rank_column, select):
+    chosen = df.groupby(["player_name", "entry_name"])["rank"].transform(select)
+    df = df[df["rank"] == chosen].sort_values("event")
+    return df.groupby(["player_name", "entry_name"], as_index=False).agg(
+        **{rank_column: ("rank", "first")},
+        rank_error=("rank_error", "max"),
+        event_list=("event", lambda events: ", ".join(str(e) for e in events)),
+    )
+
+
+def get_approximate_player_best_rank_event(sketch, duckdb_df):
+    """
+    The approximate version of get_player_best_rank_event, ranking entries against a PointsSketch
+    of the whole league instead of a RANK() window over every entry's history.
+
+    duckdb_df only needs the histories of the entries being asked about. rank_error bounds how far
+    best_rank can be from the exact rank.
+    """
+    df = _rank_events(_cumulative_ranks(sketch, duckdb_df), "best_rank", "min")
+    return df.sort_values("entry_name").reset_index(drop=True)
+
+
+def get_approximate_player_worst_rank_event(sketch, duckdb_df):
+    """
+    The approximate version of get_player_worst_rank_event, see get_approximate_player_best_rank_event.
+    """
+    df = _rank_events(_cumulative_ranks(sketch, duckdb_df), "worst_rank", "max")
+    return df.sort_values("player_name").reset_index(drop=True)
+
+
+def get_approximate_percentiles(sketch, duckdb_df):
+    """
+    Return each entry's percentile within the league for every gameweek, with its error bound.
+    """
+    df = _cumulative_ranks(sketch, duckdb_df)
+    df["percentile"], df["percentile_error"] = sketch.percentile(df["event"], df["total_points"])
+    return df[
+        ["player_name", "entry_name", "event", "total_points", "rank", "rank_error", "percentile", "percentile_error"]
+    ].reset_index(drop=True)
@@ -0,0 +1,28 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Space calls out to at most rate per second across all threads. A rate of None disables the limit.
+    """
+
+    def __init__(self, rate=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        """
+        Block until the next call is allowed.
+        """
+        if not self.rate:
+            return
+        with self._lock:
+            now = self.clock()
+            wait_for = self._next_at - now
+            self._next_at = max(now, self._next_at) + 1 / self.rate
+        if wait_for > 0:
+            self.sleep(wait_for)
@@ -0,0 +1,181 @@
+import base64
+import os
+
+import streamlit as st
+
+from src.charts import (
+    MAX_LINES,
+    total_bench_points_figure,
+    total_points_figure,
+    total_vs_bench_points_figure,
+    week_bench_points_figure,
+)
+from src.fpl_load import BootstrapLoader
+from src.results_store import ResultsStore
+from src.warmer import CacheWarmer
+
+
+@st.cache_resource
+def cache_warmer():
+    """
+    Start the in-process cache warmer for the comma separated leagues in FPL_WARM_LEAGUES, if any.
+    """
+    league_ids = [int(l) for l in os.environ.get("FPL_WARM_LEAGUES", "").split(",") if l.strip()]
+    if not league_ids:
+        return None
+    return CacheWarmer(league_ids, results_store()).start()
+
+
+@st.cache_data(ttl=300)
+def last_finished_event():
+    """
+    The latest finalized gameweek, refreshed every five minutes rather than on every visit.
+    """
+    return BootstrapLoader().get_last_finished_event()
+
+
+@st.cache_resource
+def results_store():
+    """
+    The process-wide results store, shared by every session.
+    """
+    return ResultsStore()
+
+
+@st.cache_data
+def plot_graph_race(df_data):
+    """
+    Create a League Title Race video using bar_chart_race.
+    """
+    import bar_chart_race as bcr  # Pulls in matplotlib, so only load it once a video is needed
+
+    #TODO - Customize the parameters for different league sizes
+    df_values, df_ranks = bcr.prepare_long_data(df_data, 
+                index='gameweek', 
+                columns='entry_name', 
+                values='points', 
+                steps_per_period=1)
+
+    return bcr.bar_chart_race(df_values,
+                n_bars=16, 
+                steps_per_period=30, 
+                period_length=1500, 
+                title = 'League Race', 
+                period_template='{x:.0f}', 
+                fixed_max=True, 
+                filter_column_colors=True).data
+
+def plot_total_points(df, highlight=None):
+    st.plotly_chart(total_points_figure(df, highlight))
+
+
+def plot_total_bench_points(df):
+    st.plotly_chart(total_bench_points_figure(df))
+
+
+def plot_week_bench_points(df):
+    st.plotly_chart(week_bench_points_figure(df))
+
+
+def plot_total_vs_bench_points(df):
+    st.plotly_chart(total_vs_bench_points_figure(df))
+
+
+def display_title_race(game_week_points):
+    st.markdown("## Title Race Video")
+    st.markdown("Video may take a minute to load.")
+    html_str = plot_graph_race(game_week_points)
+    start = html_str.find('base64,')+len('base64,')
+    end = html_str.find('">')
+
+    video = base64.b64decode(html_str[start:end])
+    st.video(video)
+
+
+def display_data(results, last_event):
+    # Display the max game week
+    st.markdown(f"## Data Refreshed for GW {last_event}")
+
+    st.markdown("## Best and Worst Players")
+
+    st.markdown("### Tickets To The Bottom Feeder Raffle")
+    worst_players = results["worst_player_tally"]
+    st.write(worst_players)
+
+    st.markdown("### Gameweeks Won")
+    best_players = results["best_player_tally"]
+    st.write(best_players)
+
+    st.markdown("### BORING")
+    st.markdown("![Alt Text](https://media1.tenor.com/m/513CjqCC3_sAAAAd/boring-nigel-farage.gif)")
+
+    boring_players = results["boring"]
+    st.write(boring_players)
+
+    st.markdown("## Transfer Hits")
+    st.markdown(
+        "This section displays the total transfer hits taken by each player."
+    )
+    transfer_hits_df = results["transfer_hits"]
+    st.write(transfer_hits_df)
+
+    st.markdown("## Points by Gameweek")
+    st.markdown(
+        "This section displays the points gained by each player for each gameweek."
+    )
+    points_by_gameweek_df = results["points_by_gameweek"]
+    highlight = None
+    if points_by_gameweek_df["entry_name"].nunique() > MAX_LINES:
+        # Large leagues only draw the top entries, so let the user pick one to compare
+        highlight = st.selectbox(
+            "Highlight an entry",
+            sorted(points_by_gameweek_df["entry_name"].unique()),
+            index=None,
+        )
+    plot_total_points(points_by_gameweek_df, highlight)
+
+    st.markdown("## Player's Worst Rank")
+    st.markdown(
+        "This section displays a player's best rank across the whole season."
+    )
+    player_worst_rank = results["player_worst_rank_event"]
+    # todo - Make sure dataframe displays properly
+    st.table(player_worst_rank)
+
+    st.markdown("## Player's Best Rank")
+    st.markdown(
+        "This section displays a player's best rank across the whole season."
+    )
+    player_best_rank = results["player_best_rank_event"]
+    st.table(player_best_rank)
+
+    st.markdown("## Total Points Left on Bench")
+    st.markdown(
+        "This section displays the total points left on the bench by each player."
+    )
+    total_bench_points_df = results["total_points_left_on_bench"]
+    # st.write(total_bench_points_df)
+    plot_total_bench_points(total_bench_points_df)
+
+    st.markdown("## Total Points vs Points Left on Bench")
+    st.markdown(
+        "This section displays the total points and points left on the bench by each player."
+    )
+    total_points_and_bench_points = results["total_points_and_bench_points"]
+    # st.write(total_points_and_bench_points)
+    plot_total_vs_bench_points(total_points_and_bench_points)
+
+    st.markdown("## Most Points Left on Bench in a Week")
+    st.markdown(
+        "This section displays the most points left on the bench in a week by each player."
+    )
+    week_bench_points_df = results["most_points_left_on_bench_week"]
+    # st.write(week_bench_points_df)
+    plot_week_bench_points(week_bench_points_df)
+
+    st.markdown("## Biggest Difference in Event Points")
+    st.markdown(
+        "This section displays the biggest difference in event points between any two players."
+    )
+    biggest_difference_df = results["biggest_difference"]
+    st.write(biggest_difference_df)
@@ -0,0 +1,217 @@
+"""
+Persist the wrapped question results per (league_id, last_event) so they are only
+computed once per finalized gameweek.
+
+Usage:
+    python -m src.results_store 741068 --path wrapped_results.sqlite
+"""
+import argparse
+import datetime
+import sqlite3
+import sys
+import threading
+
+from src.fpl_load import BootstrapLoader, load_league_history
+from src.questions import WRAPPED_QUESTIONS, get_wrapped_results
+
+DEFAULT_PATH = "wrapped_results.sqlite"
+
+
+def to_arrow(df):
+    """
+    Serialize a result DataFrame to an Arrow IPC stream.
+
+    Columns of dicts, such as game_weeks_won_dict, are written as Arrow maps with the
+    key and value types of their contents.
+    """
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(df.head(0), preserve_index=False)
+    for column in df.columns:
+        values = df[column].dropna()
+        if len(values) and isinstance(values.iloc[0], dict):
+            key_type = pa.array([k for d in values for k in d]).type
+            value_type = pa.array([v for d in values for v in d.values()]).type
+            schema = schema.set(schema.get_field_index(column), pa.field(column, pa.map_(key_type, value_type)))
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_arrow(payload):
+    """
+    Read a DataFrame written by to_arrow.
+    """
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(payload).read_all().to_pandas(maps_as_pydicts="strict")
+
+
+class ResultsStore:
+    """
+    A SQLite store of question results, one row per (league_id, last_event, question).
+
+    SQLite is used rather than DuckDB so the app, the warmer and the API can share the
+    file from separate processes. Results are stored as Arrow IPC streams, which keep
+    the dtypes and MAP keys that JSON would turn into strings.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        columns = {
+            name: type_ for _, name, type_, *_ in self._connection.execute("PRAGMA table_info(wrapped_results)")
+        }
+        if columns.get("payload") == "TEXT":
+            # Results stored as JSON by older versions are recomputed rather than converted
+            self._connection.execute("DROP TABLE wrapped_results")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS wrapped_results (
+                league_id INTEGER NOT NULL,
+                last_event INTEGER NOT NULL,
+                question TEXT NOT NULL,
+                payload BLOB NOT NULL,
+                computed_at TEXT NOT NULL,
+                PRIMARY KEY (league_id, last_event, question)
+            )
+            """
+        )
+        self._connection.commit()
+
+    def get_payloads(self, league_id, last_event):
+        """
+        Return {question: Arrow IPC payload} for a league at last_event, or None unless every question is stored.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT question, payload FROM wrapped_results WHERE league_id = ? AND last_event = ?",
+                (league_id, last_event),
+            ).fetchall()
+        payloads = dict(rows)
+        if not set(WRAPPED_QUESTIONS) <= set(payloads):
+            return None
+        return payloads
+
+    def get(self, league_id, last_event):
+        """
+        Return {question: DataFrame} for a league at last_event, or None if it hasn't been computed.
+        """
+        payloads = self.get_payloads(league_id, last_event)
+        if payloads is None:
+            return None
+        return {question: from_arrow(payloads[question]) for question in WRAPPED_QUESTIONS}
+
+    def put(self, league_id, last_event, results):
+        """
+        Store {question: DataFrame} for a league at last_event, replacing older gameweeks.
+        """
+        computed_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        rows = [
+            (league_id, last_event, question, to_arrow(df), computed_at)
+            for question, df in results.items()
+        ]
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM wrapped_results WHERE league_id = ? AND last_event < ?",
+                (league_id, last_event),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO wrapped_results VALUES (?, ?, ?, ?, ?)", rows
+            )
+
+    def latest_event(self, league_id):
+        """
+        Return the latest gameweek stored for a league, or None.
+        """
+        with self._lock:
+            (last_event,) = self._connection.execute(
+                "SELECT MAX(last_event) FROM wrapped_results WHERE league_id = ?",
+                (league_id,),
+            ).fetchone()
+        return last_event
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def compute_wrapped_results(league_id, last_event=None):
+    """
+    Load a league's history and answer every wrapped question, up to and including last_event.
+
+    With a last_event the results are stored for good, so the league is fetched again
+    rather than served from a cache that may predate that gameweek being finalized.
+    """
+    df = load_league_history(league_id, refresh=last_event is not None)
+    if last_event is not None:
+        df = df[df["event"] <= last_event]
+    return get_wrapped_results(df)
+
+
+def load_wrapped_results(league_id, store, last_event):
+    """
+    Return (results, last_event) for a league, serving them from the store when possible.
+
+    last_event is the latest finalized gameweek. Results are only recomputed, and stored,
+    when that gameweek has not been seen for this league before. Before the first
+    gameweek is finalized (last_event is None) the results are computed live and not stored.
+    """
+    if last_event is None:
+        results = compute_wrapped_results(league_id)
+        return results, int(results["points_by_gameweek"]["gameweek"].max())
+
+    results = store.get(league_id, last_event)
+    if results is None:
+        results = compute_wrapped_results(league_id, last_event)
+        store.put(league_id, last_event, results)
+    return results, last_event
+
+
+def precompute(league_ids, store, last_event=None, force=False):
+    """
+    Compute and store the wrapped results for a batch of leagues at the latest finalized gameweek.
+
+    Leagues already stored at that gameweek are skipped unless force is set. Returns
+    {league_id: "stored" | "cached" | error message}.
+    """
+    if last_event is None:
+        last_event = BootstrapLoader().get_last_finished_event()
+    if last_event is None:
+        raise ValueError("No gameweek has been finalized yet")
+
+    statuses = {}
+    for league_id in league_ids:
+        if not force and store.get_payloads(league_id, last_event) is not None:
+            statuses[league_id] = "cached"
+            continue
+        try:
+            store.put(league_id, last_event, compute_wrapped_results(league_id, last_event))
+        except Exception as e:
+            statuses[league_id] = f"{type(e).__name__}: {e}"
+        else:
+            statuses[league_id] = "stored"
+    return statuses
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute wrapped results for a batch of leagues.")
+    parser.add_argument("league_ids", type=int, nargs="+")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="SQLite results store.")
+    parser.add_argument("--force", action="store_true", help="Recompute leagues that are already stored.")
+    args = parser.parse_args(argv)
+
+    store = ResultsStore(args.path)
+    statuses = precompute(args.league_ids, store, force=args.force)
+    for league_id, status in statuses.items():
+        print(f"{league_id}: {status}")
+    return 0 if all(s in ("stored", "cached") for s in statuses.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import collections
+import threading
+import time
+from concurrent.futures import Future, wait
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one, and keep completed results in an LRU.
+
+    While a call for a key is in flight, other callers for that key wait for it and share
+    its result (or exception) instead of starting their own. At most max_concurrency calls
+    run at once across all keys. Completed results are kept for ttl seconds, evicting the
+    least recently used once their total sizeof exceeds max_bytes. Failures are never cached,
+    and with a ttl of 0 nothing is: only in-flight calls are shared.
+    """
+
+    def __init__(self, max_concurrency=8, max_bytes=128 * 2**20, ttl=300, sizeof=len, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.clock = clock
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        # key -> (value, size, expires_at), least recently used first
+        self._completed = collections.OrderedDict()
+        self._bytes = 0
+
+    @property
+    def cached_bytes(self):
+        return self._bytes
+
+    def do(self, key, func, refresh=False):
+        """
+        Return func() for key, sharing an in-flight or cached call where possible.
+
+        refresh skips the cached result. It still joins another refresh call that is
+        already in flight, but waits out a plain one and then runs its own, as that
+        call may have been built from data cached before the refresh was needed.
+        """
+        while True:
+            with self._lock:
+                if not refresh:
+                    cached = self._completed.get(key)
+                    if cached is not None:
+                        value, _, expires_at = cached
+                        if self.clock() < expires_at:
+                            self._completed.move_to_end(key)
+                            return value
+                        self._evict(key)
+
+                in_flight = self._in_flight.get(key)
+                if in_flight is None:
+                    future = Future()
+                    self._in_flight[key] = (future, refresh)
+                    break
+                future, in_flight_refresh = in_flight
+
+            if in_flight_refresh or not refresh:
+                return future.result()
+            # Wait for the plain call to finish, whether it succeeds or not, then try again
+            wait([future])
+
+        try:
+            with self._semaphore:
+                value = func()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._in_flight[key]
+            self._store(key, value)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key=None):
+        """
+        Drop the cached result for key, or every cached result.
+        """
+        with self._lock:
+            if key is None:
+                self._completed.clear()
+                self._bytes = 0
+            elif key in self._completed:
+                self._evict(key)
+
+    def _store(self, key, value):
+        if key in self._completed:
+            self._evict(key)
+        if self.ttl <= 0:
+            return
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        self._completed[key] = (value, size, self.clock() + self.ttl)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._evict(next(iter(self._completed)))
+
+    def _evict(self, key):
+        _, size, _ = self._completed.pop(key)
+        self._bytes -= size
@@ -0,0 +1,126 @@
+"""
+Refresh the cached league data and wrapped results as soon as a gameweek is finalized.
+
+Usage:
+    python -m src.warmer 741068 --interval 300 --rate 5 --path wrapped_results.sqlite
+"""
+import argparse
+import logging
+import sys
+import threading
+
+from src import fpl_load
+from src.fpl_load import BootstrapLoader
+from src.results_store import DEFAULT_PATH, ResultsStore, precompute
+
+logger = logging.getLogger(__name__)
+
+
+class CacheWarmer:
+    """
+    Poll bootstrap-static and, once a new gameweek is finished and data checked, refresh
+    the standings, histories and wrapped results for a list of leagues.
+
+    It can run headless (run_forever) so the shared results store is warm for every
+    process, or as a background thread inside the app (start) so its in-memory request
+    caches are warm too.
+    """
+
+    def __init__(self, league_ids, store, poll_interval=300, rate=None):
+        self.league_ids = list(league_ids)
+        self.store = store
+        self.poll_interval = poll_interval
+        self.last_warmed_event = None
+        # Leagues that failed to warm for last_warmed_event, retried on the next poll
+        self.failed_league_ids = []
+        if rate is not None:
+            fpl_load.request_limiter.rate = rate
+        self._stop = threading.Event()
+        self._thread = None
+
+    def poll(self):
+        """
+        Check for a newly finalized gameweek and warm the caches for it, or retry the
+        leagues that failed to warm for the current one.
+
+        Returns {league_id: status} when any leagues were warmed, otherwise None.
+        """
+        bootstrap = BootstrapLoader()
+        # Always ask the API, never a cached bootstrap-static
+        fpl_load.url_flight.invalidate(bootstrap.url)
+        last_event = bootstrap.get_last_finished_event()
+        if last_event is None:
+            return None
+        if last_event != self.last_warmed_event:
+            return self.warm(last_event)
+        if self.failed_league_ids:
+            # e.g. a 429 or 503 from the API just after the gameweek was finalized
+            return self._precompute(self.failed_league_ids, last_event)
+        return None
+
+    def warm(self, last_event):
+        """
+        Drop every cached response and league, then precompute the results for last_event.
+        """
+        logger.info("Warming %d leagues for GW %d", len(self.league_ids), last_event)
+        # Everything cached before the gameweek was finalized is stale
+        fpl_load.url_flight.invalidate()
+        fpl_load.league_flight.invalidate()
+        self.last_warmed_event = last_event
+        return self._precompute(self.league_ids, last_event)
+
+    def _precompute(self, league_ids, last_event):
+        statuses = precompute(league_ids, self.store, last_event)
+        self.failed_league_ids = [
+            league_id for league_id, status in statuses.items() if status not in ("stored", "cached")
+        ]
+        for league_id in self.failed_league_ids:
+            logger.warning("League %d failed to warm: %s", league_id, statuses[league_id])
+        return statuses
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Polling bootstrap-static failed")
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        """
+        Run the warmer in a background daemon thread.
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="cache-warmer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("league_ids", type=int, nargs="+")
+    parser.add_argument("--path", default=DEFAULT_PATH, help="SQLite results store.")
+    parser.add_argument("--interval", type=float, default=300, help="Seconds between polls.")
+    parser.add_argument("--rate", type=float, default=5, help="Maximum API requests per second.")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    warmer = CacheWarmer(args.league_ids, ResultsStore(args.path), args.interval, args.rate)
+    if args.once:
+        statuses = warmer.poll() or {}
+        return 0 if all(s in ("stored", "cached") for s in statuses.values()) else 1
+    try:
+        warmer.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
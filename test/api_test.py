@@ -0,0 +1,127 @@
+import asyncio
+import gzip
+import json
+import os
+import unittest
+from unittest import mock
+
+import pyarrow as pa
+from tornado.httpclient import AsyncHTTPClient
+from tornado.testing import AsyncHTTPTestCase, gen_test
+
+from benchmarks.fpl_stub import FPLStub
+from src import fpl_load
+from src.api import ARROW_CONTENT_TYPE, WrappedService, make_app
+from src.questions import WRAPPED_QUESTIONS
+from src.results_store import ResultsStore
+
+
+class TestAPI(AsyncHTTPTestCase):
+    def setUp(self):
+        self.stub = FPLStub({1: 6, 2: 7, 3: 8, 4: 120}, finished_event=3).start()
+        for patch in (
+            mock.patch.dict(os.environ, {"FPL_API_BASE_URL": self.stub.base_url}),
+            mock.patch.object(fpl_load, "MAX_LEAGUE_ENTRIES", 100),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.stub.stop)
+        fpl_load.url_flight.invalidate()
+        fpl_load.league_flight.invalidate()
+        self.store = ResultsStore(":memory:")
+        self.addCleanup(self.store.close)
+        super().setUp()
+
+    def get_app(self):
+        # Look up the finished gameweek on every request, so tests can move it on
+        return make_app(WrappedService(self.store, last_event_ttl=0))
+
+    def history_requests(self):
+        return sum(n for path, n in self.stub.request_counts.items() if path.startswith("/api/entry/"))
+
+    def test_lists_questions(self):
+        response = self.fetch("/leagues/1/questions")
+        self.assertEqual(response.code, 200)
+        body = json.loads(response.body)
+        self.assertEqual(body["last_event"], 3)
+        self.assertEqual(body["questions"], list(WRAPPED_QUESTIONS))
+
+    def test_json_question_is_stored(self):
+        response = self.fetch("/leagues/1/questions/points_by_gameweek")
+        self.assertEqual(response.code, 200)
+        rows = json.loads(response.body)["data"]
+        self.assertEqual({row["gameweek"] for row in rows}, {1, 2, 3})
+        self.assertIsNotNone(self.store.get_payloads(1, 3))
+
+        # Other questions are served from the store without reloading the league
+        requests = self.history_requests()
+        self.assertEqual(self.fetch("/leagues/1/questions/boring").code, 200)
+        self.assertEqual(self.history_requests(), requests)
+
+    def test_etag_and_not_modified(self):
+        response = self.fetch("/leagues/1/questions/best_player_tally")
+        etag = response.headers["Etag"]
+        self.assertEqual(etag, 'W/"1-3-best_player_tally-json"')
+
+        response = self.fetch("/leagues/1/questions/best_player_tally", headers={"If-None-Match": etag})
+        self.assertEqual(response.code, 304)
+        self.assertEqual(response.body, b"")
+
+        # A new finished gameweek changes the ETag
+        self.stub.finished_event = 4
+        response = self.fetch("/leagues/1/questions/best_player_tally", headers={"If-None-Match": etag})
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.headers["Etag"], 'W/"1-4-best_player_tally-json"')
+
+    @gen_test(timeout=60)
+    async def test_concurrent_leagues(self):
+        client = AsyncHTTPClient()
+        responses = await asyncio.gather(
+            *(
+                client.fetch(self.get_url(f"/leagues/{league_id}/questions/{question}"))
+                for league_id in (1, 2, 3)
+                for question in ("boring", "points_by_gameweek")
+            )
+        )
+        self.assertEqual([response.code for response in responses], [200] * 6)
+        for league_id in (1, 2, 3):
+            self.assertIsNotNone(self.store.get_payloads(league_id, 3))
+
+    def test_gzip(self):
+        for query in ("", "?format=arrow"):
+            response = self.fetch(
+                "/leagues/1/questions/points_by_gameweek" + query,
+                headers={"Accept-Encoding": "gzip"},
+                decompress_response=False,
+            )
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertEqual(response.headers["Vary"], "Accept, Accept-Encoding")
+        self.assertEqual(pa.ipc.open_stream(gzip.decompress(response.body)).read_all().num_rows, 6 * 3)
+
+    def test_arrow(self):
+        response = self.fetch("/leagues/1/questions/best_player_tally", headers={"Accept": ARROW_CONTENT_TYPE})
+        self.assertEqual(response.headers["Content-Type"], ARROW_CONTENT_TYPE)
+        self.assertEqual(response.headers["Etag"], 'W/"1-3-best_player_tally-arrow"')
+        table = pa.ipc.open_stream(response.body).read_all()
+        self.assertIn("game_weeks_won_dict", table.column_names)
+        self.assertEqual(table.schema.field("game_weeks_won_dict").type, pa.map_(pa.int64(), pa.int64()))
+
+        query = self.fetch("/leagues/1/questions/best_player_tally?format=arrow")
+        self.assertEqual(query.body, response.body)
+
+    def test_unknown_question(self):
+        self.assertEqual(self.fetch("/leagues/1/questions/nope").code, 404)
+
+    def test_unknown_league(self):
+        self.assertEqual(self.fetch("/leagues/999/questions/boring").code, 404)
+
+    def test_league_too_large(self):
+        self.assertEqual(self.fetch("/leagues/4/questions/boring").code, 422)
+        requests = self.stub.request_counts["/api/leagues-classic/4/standings/"]
+        self.assertEqual(self.fetch("/leagues/4/questions/boring").code, 422)
+        self.assertEqual(self.stub.request_counts["/api/leagues-classic/4/standings/"], requests)
+        self.assertEqual(self.history_requests(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,28 @@
+import importlib.util
+import subprocess
+import sys
+import unittest
+
+from benchmarks.startup import HEAVY_MODULES
+
+
+@unittest.skipUnless(importlib.util.find_spec("streamlit"), "streamlit is not installed")
+class TestAppStartup(unittest.TestCase):
+    def test_no_heavy_imports(self):
+        # Run in a fresh interpreter, other tests will already have imported pandas.
+        # Only modules app.py adds count: some streamlit versions import pandas themselves.
+        script = (
+            "import sys, streamlit; before = set(sys.modules); import app; "
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules and m not in before])"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+
+if __name__ == '__main__':
+    unittest.main()
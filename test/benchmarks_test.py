@@ -0,0 +1,57 @@
+import unittest
+from unittest import mock
+
+from benchmarks.run import scaling_exponent, summarise_scaling
+from benchmarks.startup import measure_startup
+from benchmarks.synthetic import make_league_history
+from src.fpl_load import LeagueHistoryLoader
+
+
+class TestSyntheticLeague(unittest.TestCase):
+    def setUp(self):
+        self.df = make_league_history(25, n_events=38)
+
+    def test_schema(self):
+        for column in LeagueHistoryLoader.league_history_schema_mapping.values():
+            self.assertIn(column, self.df.columns)
+
+    def test_shape(self):
+        self.assertEqual(len(self.df), 25 * 38)
+        self.assertEqual(self.df["entry"].nunique(), 25)
+        self.assertEqual(self.df["event"].max(), 38)
+
+
+class TestScaling(unittest.TestCase):
+    def test_scaling_exponent(self):
+        self.assertAlmostEqual(scaling_exponent(100, 0.01, 1000, 1.0), 2.0)
+        self.assertIsNone(scaling_exponent(100, 0.0001, 1000, 0.001))
+
+    def test_summarise_scaling_flags_super_linear(self):
+        results = [
+            {"case": "linear", "entries": 10, "rows": 10, "median_s": 0.01, "status": "ok"},
+            {"case": "linear", "entries": 100, "rows": 100, "median_s": 0.1, "status": "ok"},
+            {"case": "quadratic", "entries": 10, "rows": 10, "median_s": 0.01, "status": "ok"},
+            {"case": "quadratic", "entries": 100, "rows": 100, "median_s": 1.0, "status": "ok"},
+        ]
+        scaling = summarise_scaling(results, max_exponent=1.3)
+        self.assertFalse(scaling["linear"]["super_linear"])
+        self.assertTrue(scaling["quadratic"]["super_linear"])
+
+
+
+class TestStartup(unittest.TestCase):
+    def test_heavy_modules_imported_by_streamlit_are_not_flagged(self):
+        # e.g. streamlit 1.31 imports pandas itself
+        timings = {
+            "streamlit": {"streamlit": (1, 100_000), "pandas": (1, 50_000)},
+            "app": {"app": (1, 101_000), "streamlit": (1, 100_000), "pandas": (1, 50_000), "duckdb": (1, 500)},
+        }
+        with mock.patch("benchmarks.startup.import_time", side_effect=timings.__getitem__):
+            report = measure_startup(runs=1)
+        self.assertEqual(report["heavy_modules"], ["duckdb"])
+        self.assertEqual(report["heavy_modules_from_streamlit"], ["pandas"])
+        self.assertEqual(report["overhead_ms"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from benchmarks.synthetic import make_league_history
+from src.charts import (
+    MAX_BARS,
+    TOP_N,
+    total_bench_points_figure,
+    total_points_figure,
+    total_vs_bench_points_figure,
+    week_bench_points_figure,
+)
+from src.questions import (
+    get_most_points_left_on_bench_week,
+    get_points_by_gameweek,
+    get_total_points_and_bench_points,
+    get_total_points_left_on_bench,
+)
+
+
+class TestTotalPointsFigure(unittest.TestCase):
+    def test_small_league_draws_every_entry(self):
+        df = get_points_by_gameweek(make_league_history(8, n_events=5))
+        fig = total_points_figure(df)
+        self.assertEqual(len(fig.data), 8)
+        self.assertFalse(any(trace.type == "scattergl" for trace in fig.data))
+
+    def test_large_league_draws_top_n_and_highlight(self):
+        df = get_points_by_gameweek(make_league_history(200, n_events=5))
+        last = df[df["gameweek"] == 5].sort_values("points")
+        highlight = last["entry_name"].iloc[0]
+        fig = total_points_figure(df, highlight=highlight)
+
+        self.assertTrue(all(trace.type == "scattergl" for trace in fig.data))
+        names = [trace.name for trace in fig.data]
+        self.assertIn(highlight, names)
+        self.assertIn(last["entry_name"].iloc[-1], names)
+        entry_names = set(df["entry_name"])
+        self.assertEqual(len([n for n in names if n in entry_names]), TOP_N + 1)
+
+
+class TestBarFigures(unittest.TestCase):
+    def setUp(self):
+        self.df = make_league_history(100, n_events=5)
+
+    def test_large_league_aggregates_bars(self):
+        fig = total_bench_points_figure(get_total_points_left_on_bench(self.df))
+        self.assertEqual(len(fig.data[0].x), MAX_BARS + 1)
+        self.assertEqual(fig.data[0].x[-1], f"Other {100 - MAX_BARS} entries (average)")
+
+    def test_stacked_bars_aggregate_both_columns(self):
+        fig = total_vs_bench_points_figure(get_total_points_and_bench_points(self.df))
+        self.assertEqual([len(trace.x) for trace in fig.data], [MAX_BARS + 1] * 2)
+
+    def test_tied_weeks_count_entries_once(self):
+        df = get_most_points_left_on_bench_week(self.df)
+        self.assertGreater(len(df), 100)
+        fig = week_bench_points_figure(df)
+        bars = list(fig.data[0].x)
+        self.assertEqual(len(set(bars[:-1])), MAX_BARS)
+        self.assertEqual(bars[-1], f"Other {100 - MAX_BARS} entries (average)")
+
+    def test_small_league_keeps_every_bar(self):
+        fig = total_bench_points_figure(get_total_points_left_on_bench(self.df), max_bars=200)
+        self.assertEqual(len(fig.data[0].x), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
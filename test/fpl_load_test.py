@@ -1,6 +1,12 @@
+import os
 import unittest
+from unittest import mock
+
 import pandas as pd
-from src.fpl_load import FPLDataLoader, StandingsLoader, HistoryLoader, LeagueHistoryLoader  # Assuming the classes are in fpl_load.py
+
+from benchmarks.fpl_stub import FPLStub
+from src import fpl_load
+from src.fpl_load import FPLDataLoader, StandingsLoader, HistoryLoader, LeagueHistoryLoader, LeagueTooLargeError  # Assuming the classes are in fpl_load.py
 
 class TestFPLDataLoader(unittest.TestCase):
     def setUp(self):
@@ -37,5 +43,26 @@ class TestLeagueHistoryLoader(unittest.TestCase):
     def test_init(self):
         self.assertEqual(self.league_history_loader.league_id, 789)
 
+class TestStandingsPages(unittest.TestCase):
+    def setUp(self):
+        self.stub = FPLStub({1: 60, 2: 120}, finished_event=3).start()
+        self.addCleanup(self.stub.stop)
+        for patch in (
+            mock.patch.dict(os.environ, {"FPL_API_BASE_URL": self.stub.base_url}),
+            mock.patch.object(fpl_load, "MAX_LEAGUE_ENTRIES", 100),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+        fpl_load.url_flight.invalidate()
+
+    def test_follows_pages_up_to_the_cap(self):
+        self.assertEqual(len(StandingsLoader(1).get_data()), 60)
+
+    def test_league_over_the_cap(self):
+        with self.assertRaises(LeagueTooLargeError):
+            StandingsLoader(2).get_data()
+        self.assertEqual(len(StandingsLoader(2, all_pages=True).get_data()), 120)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
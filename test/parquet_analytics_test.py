@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from benchmarks.synthetic import make_league_history, write_synthetic_leagues
+from src.parquet_analytics import ParquetHistories, write_league_history
+from src.questions import WRAPPED_QUESTIONS
+
+
+class TestParquetHistories(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        write_synthetic_leagues(self.root, n_leagues=3, n_entries=6, n_events=5)
+        self.histories = ParquetHistories(self.root, threads=2, memory_limit="256MB")
+        self.addCleanup(self.histories.close)
+
+    def test_matches_in_memory_questions(self):
+        df = pd.concat(make_league_history(6, 5, seed=league_id) for league_id in (1, 2, 3))
+        for question in ("points_by_gameweek", "total_points_left_on_bench", "player_best_rank_event"):
+            expected = WRAPPED_QUESTIONS[question](df)
+            actual = self.histories.query(question).df()
+            key = list(expected.columns)
+            pd.testing.assert_frame_equal(
+                actual[key].sort_values(key).reset_index(drop=True),
+                expected.sort_values(key).reset_index(drop=True),
+                check_dtype=False,
+            )
+
+    def test_questions_are_per_league(self):
+        biggest_difference = self.histories.query("biggest_difference").df()
+        self.assertEqual(sorted(biggest_difference["league_id"]), [1, 2, 3])
+
+    def test_stream_batches(self):
+        batches = list(self.histories.stream("transfer_hits", batch_size=4))
+        self.assertTrue(all(len(batch) <= 4 for batch in batches))
+        self.assertEqual(
+            sum(len(batch) for batch in batches),
+            len(self.histories.query("transfer_hits").df()),
+        )
+
+    def test_entries_in_several_leagues_count_once(self):
+        # The same league written under another league id shares all of its entries
+        df = make_league_history(6, 5, seed=1)
+        df["league_id"] = 4
+        write_league_history(df, self.root)
+        histories = ParquetHistories(self.root)
+        self.addCleanup(histories.close)
+        self.assertEqual(histories.query("league_winner_transfer_hits").df()["league_id"].tolist(), [1, 2, 3, 4])
+        percentiles = histories.query("bench_points_percentiles").df()
+        self.assertEqual(percentiles["entries"].iloc[0], 18)
+
+    def test_cross_league_questions(self):
+        percentiles = self.histories.query("bench_points_percentiles").df()
+        self.assertEqual(percentiles["entries"].iloc[0], 18)
+        winners = self.histories.query("league_winner_transfer_hits").df()
+        self.assertEqual(winners["league_id"].tolist(), [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import duckdb
+import pandas as pd
+
+from benchmarks.synthetic import make_league_history
+from src.questions import WRAPPED_QUESTIONS, get_biggest_difference, get_points_by_gameweek, get_wrapped_results
+
+# The original self-join get_biggest_difference, as a reference on small leagues
+SELF_JOIN_BIGGEST_DIFFERENCE = """
+    SELECT 
+        a.event, 
+        a.player_name AS player1, 
+        b.player_name AS player2, 
+        ABS(a.event_points - b.event_points) AS difference
+    FROM 
+        history a, 
+        history b
+    WHERE 
+        a.event = b.event AND 
+        a.player_name != b.player_name
+    ORDER BY 
+        difference DESC
+    LIMIT 1
+"""
+
+
+def self_join_biggest_difference(df):
+    with duckdb.connect() as connection:
+        connection.register("history", df)
+        return connection.sql(SELF_JOIN_BIGGEST_DIFFERENCE).df()
+
+
+class TestQuestions(unittest.TestCase):
+    def test_concurrent_leagues(self):
+        # DuckDB's default connection hangs when shared between threads
+        histories = [make_league_history(8, n_events=5, seed=seed) for seed in range(1, 5)]
+        with ThreadPoolExecutor(4) as executor:
+            futures = [executor.submit(get_wrapped_results, df) for df in histories * 2]
+            results = [future.result(timeout=60) for future in futures]
+        self.assertTrue(all(set(r) == set(WRAPPED_QUESTIONS) for r in results))
+
+    def test_history_without_league_id(self):
+        df = make_league_history(6, n_events=4)
+        expected = get_points_by_gameweek(df)
+        result = get_points_by_gameweek(df.drop(columns="league_id"))
+        self.assertTrue((result["league_id"] == 0).all())
+        pd.testing.assert_frame_equal(
+            result.drop(columns="league_id"), expected.drop(columns="league_id")
+        )
+        self.assertEqual(set(get_wrapped_results(df.drop(columns="league_id"))), set(WRAPPED_QUESTIONS))
+
+
+
+class TestBiggestDifference(unittest.TestCase):
+    def assertMatchesSelfJoin(self, df):
+        result = get_biggest_difference(df)
+        self.assertEqual(len(result), 1)
+        row = result.iloc[0]
+        self.assertNotEqual(row["player1"], row["player2"])
+        self.assertEqual(row["difference"], row["points1"] - row["points2"])
+        self.assertEqual(row["difference"], self_join_biggest_difference(df)["difference"].iloc[0])
+        return row
+
+    def test_matches_self_join(self):
+        for seed in range(1, 6):
+            self.assertMatchesSelfJoin(make_league_history(7, n_events=4, seed=seed))
+
+    def test_equal_points(self):
+        df = make_league_history(3, n_events=2)
+        df["event_points"] = 50
+        row = self.assertMatchesSelfJoin(df)
+        self.assertEqual((row["player1"], row["player2"], row["difference"]), ("Player 0", "Player 1", 0))
+
+    def test_one_player_owns_both_extremes(self):
+        df = make_league_history(4, n_events=1)
+        df["event_points"] = [100, 10, 60, 40]
+        df["player_name"] = ["Player 0", "Player 0", "Player 2", "Player 3"]
+        row = self.assertMatchesSelfJoin(df)
+        self.assertEqual(row["difference"], 60)
+
+    def test_one_row_per_league(self):
+        df = pd.concat([make_league_history(5, n_events=3, seed=seed) for seed in (1, 2)])
+        self.assertEqual(sorted(get_biggest_difference(df)["league_id"]), [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from benchmarks.fpl_stub import FPLStub
+from benchmarks.synthetic import make_league_history
+from src import fpl_load
+from src.questions import get_player_best_rank_event, get_player_worst_rank_event
+from src.rank_sketch import (
+    PointsSketch,
+    get_approximate_percentiles,
+    get_approximate_player_best_rank_event,
+    get_approximate_player_worst_rank_event,
+    sketch_league,
+)
+
+
+def build_sketch(df, bucket_width=1):
+    sketch = PointsSketch(bucket_width)
+    for _, history_df in df.groupby("entry"):
+        sketch.add_history(history_df)
+    return sketch
+
+
+class TestPointsSketch(unittest.TestCase):
+    def setUp(self):
+        self.df = make_league_history(60, n_events=10)
+
+    def test_exact_with_unit_buckets(self):
+        sketch = build_sketch(self.df)
+        for approximate, exact, column in (
+            (get_approximate_player_best_rank_event, get_player_best_rank_event, "best_rank"),
+            (get_approximate_player_worst_rank_event, get_player_worst_rank_event, "worst_rank"),
+        ):
+            expected = exact(self.df).drop(columns="league_id")
+            actual = approximate(sketch, self.df)
+            self.assertEqual(actual[column].tolist(), expected[column].tolist())
+            self.assertEqual(actual["event_list"].tolist(), expected["event_list"].tolist())
+            self.assertEqual(actual["rank_error"].max(), 0)
+
+    def test_error_bound_holds_with_wide_buckets(self):
+        exact = get_approximate_percentiles(build_sketch(self.df), self.df)
+        approximate = get_approximate_percentiles(build_sketch(self.df, bucket_width=25), self.df)
+        self.assertTrue((approximate["rank_error"] > 0).any())
+        self.assertTrue(
+            (np.abs(approximate["rank"] - exact["rank"]) <= approximate["rank_error"]).all()
+        )
+
+    def test_memory_is_independent_of_league_size(self):
+        small = build_sketch(make_league_history(10, n_events=10), bucket_width=10)
+        large = build_sketch(make_league_history(2000, n_events=10), bucket_width=10)
+        self.assertLessEqual(large.nbytes, 2 * small.nbytes)
+        self.assertEqual(large.entries(10), 2000)
+
+    def test_merge(self):
+        first = self.df[self.df["entry"] < self.df["entry"].median()]
+        second = self.df[self.df["entry"] >= self.df["entry"].median()]
+        merged = build_sketch(first)
+        merged.merge(build_sketch(second))
+        np.testing.assert_array_equal(merged.counts, build_sketch(self.df).counts)
+
+    def test_negative_totals(self):
+        sketch = PointsSketch()
+        sketch.add([1, 1, 1, 1], [-8, -4, 0, 3])
+        ranks, errors = sketch.rank([1, 1, 1, 1], [-8, -4, 0, 3])
+        self.assertEqual(ranks.tolist(), [4, 3, 2, 1])
+        self.assertEqual(errors.max(), 0)
+
+        # Merging a sketch with a lower points range
+        other = PointsSketch()
+        other.add([1], [-12])
+        sketch.merge(other)
+        self.assertEqual(sketch.rank([1, 1], [-12, -8])[0].tolist(), [5, 4])
+        self.assertEqual(sketch.entries(1), 5)
+
+    def test_totals_outside_counted_range(self):
+        sketch = PointsSketch(bucket_width=10)
+        sketch.add([1, 1, 1], [10, 25, 40])
+        ranks, errors = sketch.rank([1, 1], [500, -50])
+        self.assertEqual(ranks.tolist(), [1, 4])
+        self.assertEqual(errors.tolist(), [0, 0])
+
+    def test_events_without_entries(self):
+        sketch = PointsSketch()
+        sketch.add([1, 1, 2, 2], [50, 60, 100, 110])
+        for event in (0, 3):
+            with self.assertRaisesRegex(ValueError, f"gameweek {event}"):
+                sketch.rank([1, event], [50, 50])
+            with self.assertRaisesRegex(ValueError, f"gameweek {event}"):
+                sketch.percentile([event], [50])
+
+    def test_percentiles(self):
+        percentiles = get_approximate_percentiles(build_sketch(self.df), self.df)
+        last = percentiles[percentiles["event"] == 10]
+        self.assertEqual(last["percentile"].max(), 100)
+        self.assertAlmostEqual(last["percentile"].min(), 100 / 60)
+
+
+class TestSketchLeague(unittest.TestCase):
+    def test_counts_every_standings_page(self):
+        stub = FPLStub({1: 120}, finished_event=5).start()
+        self.addCleanup(stub.stop)
+        env = mock.patch.dict(os.environ, {"FPL_API_BASE_URL": stub.base_url})
+        env.start()
+        self.addCleanup(env.stop)
+        fpl_load.url_flight.invalidate()
+
+        sketch = sketch_league(1)
+        self.assertEqual(sketch.entries(5), 120)
+        self.assertEqual(stub.request_counts["/api/leagues-classic/1/standings/"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
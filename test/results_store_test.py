@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from benchmarks.fpl_stub import FPLStub
+from benchmarks.synthetic import make_league_history
+from src import fpl_load
+from src.questions import WRAPPED_QUESTIONS, get_wrapped_results
+from src.results_store import ResultsStore, load_wrapped_results, precompute
+
+
+class TestResultsStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultsStore(":memory:")
+        self.results = get_wrapped_results(make_league_history(12, n_events=10))
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_round_trip(self):
+        self.store.put(123, 10, self.results)
+        stored = self.store.get(123, 10)
+        self.assertEqual(set(stored), set(WRAPPED_QUESTIONS))
+        for question, df in self.results.items():
+            pd.testing.assert_frame_equal(stored[question], df)
+
+    def test_missing(self):
+        self.assertIsNone(self.store.get(123, 10))
+        self.assertIsNone(self.store.latest_event(123))
+
+    def test_put_replaces_older_gameweeks(self):
+        self.store.put(123, 9, self.results)
+        self.store.put(123, 10, self.results)
+        self.assertIsNone(self.store.get(123, 9))
+        self.assertEqual(self.store.latest_event(123), 10)
+
+
+    def test_drops_json_results(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.sqlite")
+            connection = sqlite3.connect(path)
+            connection.execute(
+                "CREATE TABLE wrapped_results (league_id INTEGER NOT NULL, last_event INTEGER NOT NULL, "
+                "question TEXT NOT NULL, payload TEXT NOT NULL, computed_at TEXT NOT NULL, "
+                "PRIMARY KEY (league_id, last_event, question))"
+            )
+            connection.execute("INSERT INTO wrapped_results VALUES (123, 10, 'boring', '{}', '')")
+            connection.commit()
+            connection.close()
+
+            store = ResultsStore(path)
+            self.assertIsNone(store.latest_event(123))
+            store.put(123, 10, self.results)
+            pd.testing.assert_frame_equal(store.get(123, 10)["boring"], self.results["boring"])
+            store.close()
+
+
+class TestLoadWrappedResults(unittest.TestCase):
+    def setUp(self):
+        self.store = ResultsStore(":memory:")
+        self.results = get_wrapped_results(make_league_history(12, n_events=10))
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_only_recomputes_on_new_gameweek(self):
+        with mock.patch(
+            "src.results_store.compute_wrapped_results", return_value=self.results
+        ) as compute:
+            load_wrapped_results(123, self.store, 10)
+            results, last_event = load_wrapped_results(123, self.store, 10)
+            self.assertEqual(compute.call_count, 1)
+            self.assertEqual(last_event, 10)
+            self.assertEqual(set(results), set(WRAPPED_QUESTIONS))
+
+            load_wrapped_results(123, self.store, 11)
+            self.assertEqual(compute.call_count, 2)
+
+    def test_precompute(self):
+        with mock.patch(
+            "src.results_store.compute_wrapped_results", return_value=self.results
+        ):
+            statuses = precompute([1, 2], self.store, last_event=10)
+            self.assertEqual(statuses, {1: "stored", 2: "stored"})
+            statuses = precompute([1, 2, 3], self.store, last_event=10)
+            self.assertEqual(statuses, {1: "cached", 2: "cached", 3: "stored"})
+
+
+class TestComputeAfterFinalization(unittest.TestCase):
+    def setUp(self):
+        # GW4 is live, so its points can still change before it is finalized
+        self.stub = FPLStub({1: 4}, finished_event=3, current_event=4).start()
+        env = mock.patch.dict(os.environ, {"FPL_API_BASE_URL": self.stub.base_url})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(self.stub.stop)
+        fpl_load.url_flight.invalidate()
+        fpl_load.league_flight.invalidate()
+        self.store = ResultsStore(":memory:")
+        self.addCleanup(self.store.close)
+
+    def test_stored_results_are_not_served_from_live_cache(self):
+        load_wrapped_results(1, self.store, 3)
+        fpl_load.load_league_history(1)  # e.g. a live view of the league, cached during GW4
+
+        for history in self.stub.histories.values():
+            history[3]["points"] += 3
+        self.stub.finished_event = 4
+        results, _ = load_wrapped_results(1, self.store, 4)
+
+        points = results["points_by_gameweek"]
+        totals = points[points["gameweek"] == 4].set_index("entry_name")["points"]
+        expected = {
+            f"Team {i}": sum(record["points"] for record in history[:4])
+            for i, history in enumerate(self.stub.histories.values())
+        }
+        self.assertEqual(totals.to_dict(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import threading
+import unittest
+
+from src.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return b"standings"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("url", fetch))) for _ in range(5)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b"standings"] * 5)
+
+    def test_refresh_does_not_share_a_plain_call(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def stale():
+            started.set()
+            release.wait(5)
+            return b"cached standings"
+
+        plain = threading.Thread(target=lambda: flight.do("url", stale))
+        plain.start()
+        started.wait(5)
+        results = []
+        refresh = threading.Thread(
+            target=lambda: results.append(flight.do("url", lambda: b"fresh standings", refresh=True))
+        )
+        refresh.start()
+        release.set()
+        plain.join(5)
+        refresh.join(5)
+
+        self.assertEqual(results, [b"fresh standings"])
+        self.assertEqual(flight.do("url", lambda: b"-"), b"fresh standings")
+
+    def test_completed_results_are_cached_until_ttl(self):
+        now = [0]
+        flight = SingleFlight(ttl=10, clock=lambda: now[0])
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return b"history"
+
+        flight.do("url", fetch)
+        flight.do("url", fetch)
+        self.assertEqual(len(calls), 1)
+        flight.do("url", fetch, refresh=True)
+        self.assertEqual(len(calls), 2)
+        now[0] = 11
+        flight.do("url", fetch)
+        self.assertEqual(len(calls), 3)
+
+    def test_zero_ttl_caches_nothing(self):
+        flight = SingleFlight(ttl=0)
+        flight.do("url", lambda: b"history")
+        self.assertEqual(flight.cached_bytes, 0)
+        self.assertEqual(flight.do("url", lambda: b"new"), b"new")
+
+    def test_lru_memory_budget(self):
+        flight = SingleFlight(max_bytes=10)
+        flight.do("a", lambda: b"12345")
+        flight.do("b", lambda: b"12345")
+        flight.do("a", lambda: b"-----")  # Cached, and now most recently used
+        flight.do("c", lambda: b"12345")
+        self.assertEqual(flight.cached_bytes, 10)
+        self.assertEqual(flight.do("a", lambda: b"-----"), b"12345")
+        self.assertEqual(flight.do("b", lambda: b"-----"), b"-----")
+
+    def test_failures_are_shared_but_not_cached(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("url", fail)
+        self.assertEqual(flight.do("url", lambda: b"ok"), b"ok")
+
+    def test_concurrency_limit(self):
+        flight = SingleFlight(max_concurrency=2)
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        release = threading.Event()
+
+        def fetch():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait(0.2)
+            with lock:
+                running[0] -= 1
+            return b"x"
+
+        threads = [threading.Thread(target=flight.do, args=(key, fetch)) for key in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(peak[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import unittest
+from unittest import mock
+
+from benchmarks.fpl_stub import FPLStub
+from src import fpl_load
+from src.rate_limit import RateLimiter
+from src.results_store import ResultsStore
+from src.warmer import CacheWarmer
+
+
+class TestCacheWarmer(unittest.TestCase):
+    def setUp(self):
+        self.stub = FPLStub({1: 5, 2: 8}, finished_event=3).start()
+        env = mock.patch.dict(os.environ, {"FPL_API_BASE_URL": self.stub.base_url})
+        env.start()
+        self.addCleanup(env.stop)
+        self.addCleanup(self.stub.stop)
+        fpl_load.url_flight.invalidate()
+        fpl_load.league_flight.invalidate()
+        self.store = ResultsStore(":memory:")
+        self.warmer = CacheWarmer([1, 2], self.store)
+
+    def tearDown(self):
+        self.store.close()
+
+    def history_requests(self):
+        return sum(n for path, n in self.stub.request_counts.items() if path.startswith("/api/entry/"))
+
+    def test_warms_on_finalized_gameweek(self):
+        self.assertEqual(self.warmer.poll(), {1: "stored", 2: "stored"})
+        results = self.store.get(1, 3)
+        self.assertEqual(results["points_by_gameweek"]["gameweek"].max(), 3)
+        self.assertEqual(self.store.get(2, 3)["points_by_gameweek"]["entry_name"].nunique(), 8)
+
+    def test_no_refresh_until_next_gameweek(self):
+        self.warmer.poll()
+        requests_after_warm = self.history_requests()
+        self.assertIsNone(self.warmer.poll())
+        self.assertEqual(self.history_requests(), requests_after_warm)
+        self.assertEqual(self.stub.request_counts["/api/bootstrap-static/"], 2)
+
+        self.stub.finished_event = 4
+        self.assertEqual(self.warmer.poll(), {1: "stored", 2: "stored"})
+        self.assertEqual(self.store.latest_event(1), 4)
+        self.assertGreater(self.history_requests(), requests_after_warm)
+
+    def test_retries_failed_leagues(self):
+        entry = self.stub.standings[2][0]["entry"]
+        self.stub.fail_next[f"/api/entry/{entry}/history/"] = 1
+        statuses = self.warmer.poll()
+        self.assertEqual(statuses[1], "stored")
+        self.assertIn("503", statuses[2])
+        self.assertIsNone(self.store.get(2, 3))
+
+        self.assertEqual(self.warmer.poll(), {2: "stored"})
+        self.assertIsNotNone(self.store.get(2, 3))
+        self.assertIsNone(self.warmer.poll())
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_spaces_out_calls(self):
+        now = [0.0]
+        sleeps = []
+        limiter = RateLimiter(rate=2, clock=lambda: now[0], sleep=sleeps.append)
+        for _ in range(3):
+            limiter.wait()
+        self.assertEqual(sleeps, [0.5, 1.0])
+
+    def test_unlimited(self):
+        sleeps = []
+        limiter = RateLimiter(sleep=sleeps.append)
+        limiter.wait()
+        limiter.wait()
+        self.assertEqual(sleeps, [])
+
+
+if __name__ == '__main__':
+    unittest.main()